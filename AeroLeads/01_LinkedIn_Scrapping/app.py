@@ -3,11 +3,17 @@ LinkedIn Profile Scraper - Streamlit Frontend (Local MacBook Version)
 WARNING: This application is for educational purposes only.
 Using automated scraping violates LinkedIn's Terms of Service.
 """
+import math
+import os
+import time
 import streamlit as st
 import pandas as pd
 from datetime import datetime
 from config import Config
-from scraper import run_scraper
+from scrape_worker import ScrapeWorker, ACTIVE_STATES
+from scrape_job import ScrapeJob
+from browser_session import BrowserSession
+from profile_store import ProfileStore, PROFILE_COLUMNS
 
 # Page configuration
 st.set_page_config(
@@ -55,6 +61,16 @@ if not is_valid:
 else:
     st.sidebar.success("✅ Credentials configured")
 
+@st.cache_resource
+def get_browser_session():
+    """One warm, logged-in browser shared by every rerun of this script"""
+    return BrowserSession()
+
+@st.cache_resource
+def get_scrape_worker():
+    """Background worker shared by every session on this server"""
+    return ScrapeWorker(browser_session=get_browser_session())
+
 # Browser visibility option
 st.sidebar.subheader("🌐 Browser Settings")
 visible_browser = st.sidebar.checkbox(
@@ -68,6 +84,30 @@ if visible_browser:
 else:
     st.sidebar.warning("⚠️ Headless mode - may trigger more security challenges")
 
+lean_mode = st.sidebar.checkbox(
+    "Lean Page Loads",
+    value=Config.LEAN_PAGE_LOAD,
+    help="Block images, fonts and video and stop waiting once the page text is ready"
+)
+
+keep_browser = st.sidebar.checkbox(
+    "Keep Browser Open Between Runs",
+    value=True,
+    help=f"Reuse a logged-in browser across runs; it closes after {Config.BROWSER_IDLE_TIMEOUT_MINUTES} idle minutes"
+)
+
+archive_pages = st.sidebar.checkbox(
+    "Archive Raw Pages",
+    value=Config.ARCHIVE_PAGES,
+    help="Keep compressed HTML of every profile page so `python reextract.py` can re-parse them after selector fixes"
+)
+
+use_cache = st.sidebar.checkbox(
+    "Reuse Cached Profiles",
+    value=True,
+    help=f"Skip re-scraping profiles fetched in the last {Config.PROFILE_CACHE_TTL_HOURS} hours"
+)
+
 # Filters
 st.sidebar.subheader("🔍 Search Filters")
 
@@ -119,19 +159,23 @@ num_profiles = st.sidebar.slider(
     help=f"Maximum {Config.MAX_PROFILES_LIMIT} profiles recommended"
 )
 
-# Initialize session state
-if 'scraping' not in st.session_state:
-    st.session_state.scraping = False
-if 'profiles_data' not in st.session_state:
-    st.session_state.profiles_data = None
+# Resume an interrupted job
+st.sidebar.subheader("♻️ Resume Job")
+unfinished_jobs = {
+    f"{job.job_id} ({len(job.completed)}/{len(job.frontier) or job.max_profiles} done)": job.job_id
+    for job in ScrapeJob.list_unfinished()
+}
+resume_choice = st.sidebar.selectbox(
+    "Unfinished Jobs",
+    [""] + list(unfinished_jobs),
+    help="Continue an interrupted run with its saved filters and profile list, skipping the search"
+)
+resume_job_id = unfinished_jobs.get(resume_choice)
 
-# Progress tracking
-def update_progress(current, total, message):
-    """Update progress in Streamlit"""
-    if total > 0:
-        progress = current / total
-        st.session_state.progress_bar.progress(progress)
-    st.session_state.status_text.text(message)
+# Background worker: scrapes run off the script thread, the page polls their state
+worker = get_scrape_worker()
+task = worker.tasks.get(st.session_state.task_id) if 'task_id' in st.session_state else None
+task_active = bool(task) and task['state'] in ACTIVE_STATES
 
 # Main content area
 col1, col2 = st.columns([2, 1])
@@ -167,81 +211,52 @@ st.markdown("---")
 st.subheader("🚀 Start Scraping")
 
 if visible_browser:
-    st.info("💡 **Tip**: A Chrome browser window will open. If you see a CAPTCHA, solve it manually and the scraper will continue automatically.")
+    st.info("💡 **Tip**: A Chrome browser window will open. If you see a CAPTCHA, solve it manually in the browser and confirm it on this page.")
 
 # Start scraping button
 start_button = st.button(
     "▶️ Start Scraping",
-    disabled=st.session_state.scraping,
+    disabled=task_active,
     type="primary",
     use_container_width=True
 )
 
 if start_button:
-    st.session_state.scraping = True
-    st.session_state.profiles_data = None
+    st.session_state.task_id = worker.submit(
+        location=location,
+        industry=industry,
+        max_profiles=num_profiles,
+        job_id=resume_job_id,
+        visible=visible_browser,
+        use_cache=use_cache,
+        keep_browser=keep_browser,
+        lean=lean_mode,
+        archive_pages=archive_pages
+    )
+    st.rerun()
+
+if task_active:
+    # Progress of the running task; the page reruns itself until it finishes
+    if task['progress_total'] > 0:
+        st.progress(min(task['progress_current'] / task['progress_total'], 1.0))
+    st.text(task['message'])
     
-    # Create progress elements
-    st.session_state.progress_bar = st.progress(0)
-    st.session_state.status_text = st.empty()
+    if task['state'] == 'captcha':
+        st.warning("🧩 LinkedIn is asking for a CAPTCHA. Solve it in the browser window, then continue.")
+        if st.button("✅ I've Solved the CAPTCHA", type="primary"):
+            worker.tasks.confirm_captcha(task['id'])
+elif task and task['state'] == 'done':
+    st.success(task['result_message'])
     
-    # Run scraper
-    try:
-        with st.spinner("Initializing browser..."):
-            success, message, profiles_data = run_scraper(
-                email=Config.LINKEDIN_EMAIL,
-                password=Config.LINKEDIN_PASSWORD,
-                location=location,
-                industry=industry,
-                max_profiles=num_profiles,
-                progress_callback=update_progress,
-                visible=visible_browser
-            )
-        
-        st.session_state.scraping = False
-        
-        if success:
-            st.success(message)
-            st.session_state.profiles_data = profiles_data
-            
-            # Display results
-            st.subheader("📊 Scraped Profiles")
-            df = pd.DataFrame(profiles_data)
-            st.dataframe(df, use_container_width=True)
-            
-            # Download button
-            csv_data = df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="⬇️ Download CSV",
-                data=csv_data,
-                file_name=f"linkedin_profiles_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-                type="primary",
-                use_container_width=True
-            )
-            
-            # Statistics
-            st.subheader("📈 Statistics")
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total Profiles", len(profiles_data))
-            with col2:
-                profiles_with_company = sum(1 for p in profiles_data if p.get('current_company'))
-                st.metric("With Company Info", profiles_with_company)
-            with col3:
-                profiles_with_location = sum(1 for p in profiles_data if p.get('location'))
-                st.metric("With Location Info", profiles_with_location)
-        else:
-            st.error(f"❌ {message}")
-            
-    except Exception as e:
-        st.session_state.scraping = False
-        st.error(f"❌ An error occurred: {str(e)}")
-
-# Display previously scraped data if available
-elif st.session_state.profiles_data:
-    st.subheader("📊 Previously Scraped Profiles")
-    df = pd.DataFrame(st.session_state.profiles_data)
+    job = ScrapeJob.load(task['job_id'])
+    store = ProfileStore()
+    profiles_data = store.get_profiles(job.completed if job else [])
+    store.close()
+    run_stats = task['run_stats']
+    
+    # Display results
+    st.subheader("📊 Scraped Profiles")
+    df = pd.DataFrame(profiles_data, columns=PROFILE_COLUMNS)
     st.dataframe(df, use_container_width=True)
     
     # Download button
@@ -254,6 +269,94 @@ elif st.session_state.profiles_data:
         type="primary",
         use_container_width=True
     )
+    
+    # Statistics
+    st.subheader("📈 Statistics")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Profiles", len(profiles_data))
+    with col2:
+        profiles_with_company = sum(1 for p in profiles_data if p.get('current_company'))
+        st.metric("With Company Info", profiles_with_company)
+    with col3:
+        profiles_with_location = sum(1 for p in profiles_data if p.get('location'))
+        st.metric("With Location Info", profiles_with_location)
+    
+    # Page load statistics for this run
+    pages_loaded = run_stats.get('pages', 0)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Pages Loaded", pages_loaded)
+    with col2:
+        st.metric("Data Transferred", f"{run_stats.get('bytes', 0) / (1024 * 1024):.1f} MB")
+    with col3:
+        avg_load = run_stats.get('load_seconds', 0) / pages_loaded if pages_loaded else 0
+        st.metric("Avg Page Load", f"{avg_load:.1f} s")
+    
+    # Where the run spent its time: self time per traced phase (see the JSON run report)
+    report = run_stats.get('report')
+    if report:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Run Time", f"{report['total_seconds']:.1f} s")
+        with col2:
+            st.metric("WebDriver Round-Trips / Profile", report['round_trips_per_profile'])
+        with col3:
+            st.metric("Failed Selector Lookups", report['counters'].get('selector_misses', 0))
+        
+        st.caption("⏱️ Time by phase (seconds)")
+        breakdown = pd.Series(report['breakdown'], name="seconds").sort_values(ascending=False)
+        st.bar_chart(breakdown[breakdown > 0])
+elif task and task['state'] == 'failed':
+    st.error(f"❌ {task['result_message']}")
+
+# Profile database: every profile collected across runs, queried page by page
+st.markdown("---")
+st.subheader("🗄️ Profile Database")
+
+store = ProfileStore()
+filter_col1, filter_col2, filter_col3 = st.columns(3)
+with filter_col1:
+    search_filter = st.text_input("Search name or headline", "")
+with filter_col2:
+    company_filter = st.text_input("Company starts with", "")
+with filter_col3:
+    location_filter = st.text_input("Location starts with", "")
+filters = {'search': search_filter, 'company': company_filter, 'location': location_filter}
+
+total_profiles = store.count_profiles(**filters)
+page_size = Config.RESULTS_PAGE_SIZE
+total_pages = max(1, math.ceil(total_profiles / page_size))
+page = st.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1)
+
+rows = store.query_profiles(limit=page_size, offset=(page - 1) * page_size, **filters)
+st.caption(f"{total_profiles} profiles - page {page} of {total_pages}")
+if rows:
+    st.dataframe(pd.DataFrame(rows, columns=PROFILE_COLUMNS), use_container_width=True)
+else:
+    st.info("No stored profiles match these filters yet.")
+
+# Exports stream from the database query to a file, then download from disk
+export_col1, export_col2 = st.columns(2)
+with export_col1:
+    if st.button("📄 Export CSV", disabled=not total_profiles, use_container_width=True):
+        st.session_state.export_path = store.export_csv(Config.get_export_path('csv'), **filters)
+with export_col2:
+    if st.button("📦 Export Parquet", disabled=not total_profiles, use_container_width=True):
+        st.session_state.export_path = store.export_parquet(Config.get_export_path('parquet'), **filters)
+
+export_path = st.session_state.get('export_path')
+if export_path and os.path.exists(export_path):
+    with open(export_path, 'rb') as export_file:
+        st.download_button(
+            label=f"⬇️ Download {os.path.basename(export_path)}",
+            data=export_file,
+            file_name=os.path.basename(export_path),
+            mime="text/csv" if export_path.endswith('.csv') else "application/octet-stream",
+            type="primary",
+            use_container_width=True
+        )
+store.close()
 
 # Footer
 st.markdown("---")
@@ -264,3 +367,8 @@ st.markdown("""
     </small>
 </div>
 """, unsafe_allow_html=True)
+
+# Keep polling while this session's task is in progress
+if task_active:
+    time.sleep(Config.TASK_POLL_SECONDS)
+    st.rerun()
@@ -0,0 +1,97 @@
+"""
+Offline benchmark for LinkedInScraper hot paths
+Runs search_profiles, scrape_profile and save_to_csv against the saved fixtures
+with pacing delays stubbed out, and reports per-phase timings and throughput.
+
+Usage (from the 01_LinkedIn_Scrapping directory):
+    python -m benchmarks.bench_scraper --iterations 20 --profiles 10
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from typing import Dict, List
+from scraper import LinkedInScraper
+from pacing import PacingScheduler
+from profile_store import ProfileStore
+from benchmarks.fake_driver import FakeWebDriver
+
+
+def make_scraper() -> LinkedInScraper:
+    """Build a logged-in scraper wired to the fake driver with no delays"""
+    scraper = LinkedInScraper(visible=False)
+    scraper.driver = FakeWebDriver()
+    scraper.instrument_driver()
+    scraper.is_logged_in = True
+    scraper.random_delay = lambda *args, **kwargs: None
+    scraper.pacer = PacingScheduler(0, 0)
+    scraper.poll_seconds = 0.001
+    return scraper
+
+
+def run_once(max_profiles: int, output_path: str, store: ProfileStore) -> Dict[str, float]:
+    """Run every phase once and return wall-clock seconds per phase"""
+    scraper = make_scraper()
+    timings = {}
+
+    start = time.perf_counter()
+    profile_urls = scraper.search_profiles(max_profiles=max_profiles)
+    timings['search_profiles'] = time.perf_counter() - start
+
+    profiles_data: List[Dict] = []
+    start = time.perf_counter()
+    for url in profile_urls:
+        profile_data = scraper.scrape_profile(url)
+        if profile_data:
+            profiles_data.append(profile_data)
+    timings['scrape_profile'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scraper.save_to_csv(profiles_data, output_path, store)
+    timings['save_to_csv'] = time.perf_counter() - start
+
+    timings['profiles'] = len(profiles_data)
+    timings['round_trips'] = scraper.driver.round_trips
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the LinkedIn scraper against saved fixtures")
+    parser.add_argument('--iterations', type=int, default=20, help="Number of full runs to time")
+    parser.add_argument('--profiles', type=int, default=10, help="Profiles to collect per run")
+    args = parser.parse_args()
+
+    totals = {'search_profiles': 0.0, 'scrape_profile': 0.0, 'save_to_csv': 0.0}
+    profiles = 0
+    round_trips = 0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, 'bench_profiles.csv')
+        store = ProfileStore(os.path.join(tmp_dir, 'bench_profiles.db'))
+        for _ in range(args.iterations):
+            # Silence the scraper's per-profile logging so it does not skew timings
+            with contextlib.redirect_stdout(io.StringIO()):
+                timings = run_once(args.profiles, output_path, store)
+            for phase in totals:
+                totals[phase] += timings[phase]
+            profiles += timings['profiles']
+            round_trips += timings['round_trips']
+        store.close()
+
+    print(f"\nBenchmark: {args.iterations} runs x {args.profiles} profiles ({profiles} scraped)")
+    print(f"{'Phase':<18}{'Total (ms)':>12}{'Per run (ms)':>14}{'Per profile (ms)':>18}")
+    for phase, total in totals.items():
+        per_profile = total / profiles * 1000 if profiles else 0.0
+        print(f"{phase:<18}{total * 1000:>12.2f}{total / args.iterations * 1000:>14.2f}{per_profile:>18.3f}")
+
+    scrape_total = totals['scrape_profile']
+    if scrape_total > 0:
+        print(f"\nExtraction throughput: {profiles / scrape_total:.0f} profiles/s")
+    if profiles:
+        print(f"WebDriver round-trips per profile: {round_trips / profiles:.1f}")
+
+
+if __name__ == '__main__':
+    main()
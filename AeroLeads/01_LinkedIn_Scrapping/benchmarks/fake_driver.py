@@ -0,0 +1,168 @@
+"""
+Fake WebDriver - serves saved LinkedIn HTML fixtures without a browser
+Implements the subset of the Selenium WebDriver API used by LinkedInScraper so
+the scraper's hot paths can be benchmarked and regression-tested offline.
+"""
+import json
+import os
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+from lxml import html as lxml_html
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+from extractor import extract_profile_links
+from scraper import HARVEST_LINKS_SCRIPT, PAGE_HEIGHT_SCRIPT, NETWORK_BYTES_EVENT
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+SEARCH_FIXTURE = 'search_results.html'
+PROFILE_FIXTURES = ['profile_headline_company.html', 'profile_experience_company.html']
+
+
+def load_fixture(name: str) -> str:
+    """Read a saved HTML fixture"""
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def to_xpath(by: str, value: str) -> Optional[str]:
+    """Translate a Selenium locator to XPath (None for CSS, handled by cssselect)"""
+    if by == By.XPATH:
+        return value
+    if by == By.ID:
+        return f"//*[@id='{value}']"
+    if by == By.TAG_NAME:
+        return f"//{value}"
+    if by == By.CLASS_NAME:
+        return f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {value} ')]"
+    if by == By.CSS_SELECTOR:
+        return None
+    raise ValueError(f"Unsupported locator strategy: {by}")
+
+
+class FakeElement:
+    """Minimal WebElement backed by an lxml node"""
+
+    def __init__(self, driver: 'FakeWebDriver', node):
+        self._driver = driver
+        self._node = node
+
+    @property
+    def text(self) -> str:
+        self._driver.execute('element')
+        return ' '.join(self._node.text_content().split())
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        self._driver.execute('element')
+        value = self._node.get(name)
+        if name == 'href' and value is not None:
+            return urljoin(self._driver.current_url, value)
+        return value
+
+    def find_element(self, by: str = By.ID, value: str = None) -> 'FakeElement':
+        return self._driver._find(self._node, by, value, relative=True)[0]
+
+    def find_elements(self, by: str = By.ID, value: str = None) -> List['FakeElement']:
+        return self._driver._find(self._node, by, value, relative=True, required=False)
+
+    def send_keys(self, *values):
+        self._driver.execute('element')
+
+    def click(self):
+        self._driver.execute('element')
+
+    def is_displayed(self) -> bool:
+        return True
+
+
+class FakeWebDriver:
+    """
+    Stand-in for webdriver.Chrome that serves fixtures by URL
+    Search URLs get the search results fixture, profile URLs cycle through the
+    profile fixtures. Every call goes through execute() and counts as one
+    round-trip, as with the real driver.
+    """
+
+    def __init__(self, search_html: str = None, profile_pages: List[str] = None):
+        self.search_html = search_html or load_fixture(SEARCH_FIXTURE)
+        self.profile_pages = profile_pages or [load_fixture(name) for name in PROFILE_FIXTURES]
+        self.current_url = 'about:blank'
+        self.round_trips = 0
+        self._html = '<html><body></body></html>'
+        self._tree = None
+        self._profile_index = 0
+        self._profile_by_url: Dict[str, str] = {}
+        self._performance_log: List[Dict] = []
+
+    def execute(self, driver_command: str, params: dict = None):
+        self.round_trips += 1
+
+    def get(self, url: str):
+        self.execute('command')
+        self.current_url = url
+        if '/in/' in url:
+            if url not in self._profile_by_url:
+                page = self.profile_pages[self._profile_index % len(self.profile_pages)]
+                self._profile_by_url[url] = page
+                self._profile_index += 1
+            self._html = self._profile_by_url[url]
+        else:
+            self._html = self.search_html
+        self._tree = None
+        event = {'method': NETWORK_BYTES_EVENT, 'params': {'encodedDataLength': len(self._html.encode('utf-8'))}}
+        self._performance_log.append({'message': json.dumps({'message': event})})
+
+    def get_log(self, log_type: str) -> List[Dict]:
+        self.execute('command')
+        entries = self._performance_log if log_type == 'performance' else []
+        self._performance_log = []
+        return entries
+
+    @property
+    def page_source(self) -> str:
+        self.execute('command')
+        return self._html
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            self._tree = lxml_html.fromstring(self._html)
+        return self._tree
+
+    def _find(self, root, by: str, value: str, relative: bool = False, required: bool = True) -> List[FakeElement]:
+        self.execute('command')
+        xpath = to_xpath(by, value)
+        if xpath is None:
+            nodes = root.cssselect(value)
+        else:
+            if relative and xpath.startswith('/'):
+                xpath = f".{xpath}"
+            nodes = root.xpath(xpath)
+
+        if required and not nodes:
+            raise NoSuchElementException(f"No element matching {by}={value}")
+        return [FakeElement(self, node) for node in nodes]
+
+    def find_element(self, by: str = By.ID, value: str = None) -> FakeElement:
+        return self._find(self.tree, by, value)[0]
+
+    def find_elements(self, by: str = By.ID, value: str = None) -> List[FakeElement]:
+        return self._find(self.tree, by, value, required=False)
+
+    def execute_script(self, script: str, *args):
+        self.execute('command')
+        if script == HARVEST_LINKS_SCRIPT:
+            return [[urljoin(self.current_url, href), snippet]
+                    for href, snippet in extract_profile_links(self._html)]
+        if script == PAGE_HEIGHT_SCRIPT:
+            return len(self._html)
+        return None
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict):
+        self.execute('command')
+        return {}
+
+    def implicitly_wait(self, time_to_wait: float):
+        pass
+
+    def quit(self):
+        pass
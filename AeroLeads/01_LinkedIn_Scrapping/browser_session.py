@@ -0,0 +1,107 @@
+"""
+Warm browser session - keeps one logged-in Chrome alive across scraper runs
+The session is meant to be held outside the Streamlit script run (see
+`st.cache_resource` in app.py). Chrome uses a persisted user-data directory, so
+cookies survive restarts and most runs skip both browser startup and login.
+The browser is recycled when it stops responding, after an idle timeout, or
+once its JS heap grows past a memory ceiling.
+"""
+import threading
+import time
+from typing import Optional
+from config import Config
+from scraper import LinkedInScraper
+
+
+class BrowserSession:
+    """Health-checked, reusable LinkedInScraper guarded by a lock"""
+
+    def __init__(self, idle_timeout_seconds: float = None, max_memory_mb: float = None):
+        self.idle_timeout_seconds = (idle_timeout_seconds if idle_timeout_seconds is not None
+                                     else Config.BROWSER_IDLE_TIMEOUT_MINUTES * 60)
+        self.max_memory_mb = max_memory_mb if max_memory_mb is not None else Config.BROWSER_MAX_MEMORY_MB
+        self.scraper: Optional[LinkedInScraper] = None
+        self.visible: Optional[bool] = None
+        self.lean: Optional[bool] = None
+        self.last_used = time.time()
+        self.lock = threading.Lock()
+
+        # Close the browser in the background once it has been idle too long
+        self._reaper = threading.Thread(target=self._reap_idle, daemon=True)
+        self._reaper.start()
+
+    def acquire(self, visible: bool = True, lean: bool = None) -> LinkedInScraper:
+        """
+        Lock the session and return a ready scraper, starting Chrome only if needed
+        Must be paired with release().
+        """
+        lean = Config.LEAN_PAGE_LOAD if lean is None else lean
+        self.lock.acquire()
+        try:
+            if self.scraper and not self.is_reusable(visible, lean):
+                self.recycle()
+            if not self.scraper:
+                scraper = LinkedInScraper(visible=visible, user_data_dir=Config.get_chrome_profile_dir(), lean=lean)
+                scraper.initialize()
+                self.scraper = scraper
+                self.visible = visible
+                self.lean = lean
+            return self.scraper
+        except Exception:
+            self.lock.release()
+            raise
+
+    def release(self):
+        """Mark the session idle and unlock it"""
+        self.last_used = time.time()
+        self.lock.release()
+
+    def is_healthy(self) -> bool:
+        """Whether the browser still answers WebDriver commands"""
+        try:
+            _ = self.scraper.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def memory_mb(self) -> float:
+        """JS heap used by the current page, in MB (0 if unavailable)"""
+        try:
+            used = self.scraper.driver.execute_script(
+                "return performance.memory ? performance.memory.usedJSHeapSize : 0;")
+            return (used or 0) / (1024 * 1024)
+        except Exception:
+            return 0.0
+
+    def is_reusable(self, visible: bool, lean: bool) -> bool:
+        """Whether the running browser can serve another run as-is"""
+        if visible != self.visible or lean != self.lean:
+            return False
+        if time.time() - self.last_used > self.idle_timeout_seconds:
+            return False
+        if not self.is_healthy():
+            return False
+        if self.memory_mb() > self.max_memory_mb:
+            print(f"Recycling browser: memory above {self.max_memory_mb} MB")
+            return False
+        return True
+
+    def recycle(self):
+        """Quit the browser; the next acquire() starts a fresh one"""
+        if self.scraper:
+            self.scraper.close()
+        self.scraper = None
+        self.visible = None
+        self.lean = None
+
+    def _reap_idle(self):
+        while True:
+            time.sleep(30)
+            if self.scraper and time.time() - self.last_used > self.idle_timeout_seconds:
+                if self.lock.acquire(blocking=False):
+                    try:
+                        if self.scraper and time.time() - self.last_used > self.idle_timeout_seconds:
+                            print("Closing idle browser session")
+                            self.recycle()
+                    finally:
+                        self.lock.release()
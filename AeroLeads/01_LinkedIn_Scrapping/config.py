@@ -2,6 +2,7 @@
 Configuration module for LinkedIn Scraper (Local MacBook Version)
 """
 import os
+from datetime import datetime
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -15,8 +16,12 @@ class Config:
     LINKEDIN_PASSWORD = os.getenv('LINKEDIN_PASSWORD', '')
     
     # Scraping Settings
-    MIN_DELAY = 3  # Minimum delay between actions (seconds)
-    MAX_DELAY = 7  # Maximum delay between actions (seconds)
+    MIN_DELAY = 3  # Minimum interval between page navigations (seconds)
+    MAX_DELAY = 7  # Maximum interval between page navigations (seconds)
+    PAGE_LOAD_TIMEOUT = 20  # Max wait for a page's key elements to appear (seconds)
+    SECTION_WAIT_TIMEOUT = 3  # Max wait for lazy-loaded sections after scrolling (seconds)
+    WAIT_POLL_SECONDS = 0.25  # How often explicit waits re-check their condition
+    LEAN_PAGE_LOAD = True  # Block images/fonts/media and use the eager page-load strategy
     DEFAULT_PROFILES_TO_SCRAPE = 20
     MAX_PROFILES_LIMIT = 20  # Maximum profiles per session
     
@@ -25,9 +30,67 @@ class Config:
     LINKEDIN_FEED_URL = "https://www.linkedin.com/feed/"
     LINKEDIN_SEARCH_URL = "https://www.linkedin.com/search/results/people/"
     
+    # People search facets (filters without an id fall back to keywords + snippet matching)
+    LOCATION_GEO_URNS = {
+        "United States": "103644278",
+        "United Kingdom": "101165590",
+        "India": "102713980",
+        "Canada": "101174742",
+        "Australia": "101452733",
+        "Germany": "101282230",
+        "France": "105015875",
+        "Singapore": "102454443",
+        "Netherlands": "102890719",
+    }
+    INDUSTRY_IDS = {
+        "Technology": "96",  # Information Technology & Services
+        "Software Development": "4",
+        "Finance": "43",  # Financial Services
+        "Healthcare": "14",  # Hospitals and Health Care
+        "Marketing": "80",  # Marketing & Advertising
+        "Education": "69",  # Education Management
+        "Consulting": "11",  # Management Consulting
+        "Retail": "27",
+    }
+    
     # Data Storage (Local)
     DATA_DIR = "data"
     OUTPUT_CSV = "linkedin_profiles.csv"
+    OUTPUT_JOURNAL_CSV = "linkedin_profiles_journal.csv"  # Append-only, survives crashes
+    OUTPUT_FSYNC_BATCH = 5  # Records written between fsync calls
+    
+    JOBS_DIR = "jobs"  # Checkpoints for resumable scrape jobs (under DATA_DIR)
+    MAX_PROFILE_ATTEMPTS = 3  # A profile failing this many times is given up on, so its job can finish
+    
+    # Warm Browser Session (reused across Streamlit reruns)
+    CHROME_PROFILE_DIR = "chrome_profile"  # Persisted Chrome user-data dir (under DATA_DIR)
+    BROWSER_IDLE_TIMEOUT_MINUTES = 15  # Close the browser after this much inactivity
+    BROWSER_MAX_MEMORY_MB = 1024  # Recycle the browser once its JS heap exceeds this
+    
+    # Background Scrape Worker (the Streamlit page polls task state instead of blocking)
+    TASKS_DB = "tasks.db"
+    SCRAPE_WORKERS = 1  # Concurrent scrapes; further tasks wait in the queue
+    TASK_POLL_SECONDS = 1  # How often the page and worker re-check task state
+    CAPTCHA_WAIT_MINUTES = 10  # Give up on a login CAPTCHA nobody confirms
+    
+    # Adaptive Selectors
+    SELECTOR_STATS_FILE = "selector_stats.json"
+    SELECTOR_STALE_AFTER = 3  # Consecutive misses before a selector is reported as stale
+    SELECTOR_PROBE_EVERY = 5  # Try the whole selector chain on every Nth profile
+    
+    # Raw Page Archive (for offline re-extraction with reextract.py)
+    ARCHIVE_PAGES = False
+    ARCHIVE_DIR = "archive"  # Under DATA_DIR
+    
+    # Profile Database (SQLite, accumulates profiles across runs)
+    PROFILES_DB = "profiles.db"
+    EXPORTS_DIR = "exports"  # Under DATA_DIR
+    RESULTS_PAGE_SIZE = 50  # Rows per page in the results view
+    
+    # Profile Cache (skip re-scraping recently fetched profiles)
+    PROFILE_CACHE_FILE = "profile_cache.json"
+    PROFILE_CACHE_TTL_HOURS = 24 * 7
+    PROFILE_CACHE_MAX_ENTRIES = 5000
     
     @classmethod
     def validate_credentials(cls):
@@ -41,3 +104,67 @@ class Config:
         """Get full path for output CSV file"""
         os.makedirs(cls.DATA_DIR, exist_ok=True)
         return os.path.join(cls.DATA_DIR, cls.OUTPUT_CSV)
+    
+    @classmethod
+    def get_run_report_path(cls):
+        """Get a timestamped path for a run's timing report, next to the output CSV"""
+        stem = os.path.splitext(cls.get_output_path())[0]
+        return f"{stem}_run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    
+    @classmethod
+    def get_cache_path(cls):
+        """Get full path for the profile cache file"""
+        os.makedirs(cls.DATA_DIR, exist_ok=True)
+        return os.path.join(cls.DATA_DIR, cls.PROFILE_CACHE_FILE)
+    
+    @classmethod
+    def get_journal_path(cls):
+        """Get full path for the append-only output journal"""
+        os.makedirs(cls.DATA_DIR, exist_ok=True)
+        return os.path.join(cls.DATA_DIR, cls.OUTPUT_JOURNAL_CSV)
+    
+    @classmethod
+    def get_jobs_dir(cls):
+        """Get directory holding scrape job checkpoints"""
+        jobs_dir = os.path.join(cls.DATA_DIR, cls.JOBS_DIR)
+        os.makedirs(jobs_dir, exist_ok=True)
+        return jobs_dir
+    
+    @classmethod
+    def get_chrome_profile_dir(cls):
+        """Get absolute path of the persisted Chrome user-data directory"""
+        profile_dir = os.path.abspath(os.path.join(cls.DATA_DIR, cls.CHROME_PROFILE_DIR))
+        os.makedirs(profile_dir, exist_ok=True)
+        return profile_dir
+    
+    @classmethod
+    def get_tasks_db_path(cls):
+        """Get full path for the background task database"""
+        os.makedirs(cls.DATA_DIR, exist_ok=True)
+        return os.path.join(cls.DATA_DIR, cls.TASKS_DB)
+    
+    @classmethod
+    def get_selector_stats_path(cls):
+        """Get full path for the selector hit-rate statistics file"""
+        os.makedirs(cls.DATA_DIR, exist_ok=True)
+        return os.path.join(cls.DATA_DIR, cls.SELECTOR_STATS_FILE)
+    
+    @classmethod
+    def get_archive_dir(cls):
+        """Get directory of the raw page archive"""
+        archive_dir = os.path.join(cls.DATA_DIR, cls.ARCHIVE_DIR)
+        os.makedirs(archive_dir, exist_ok=True)
+        return archive_dir
+    
+    @classmethod
+    def get_db_path(cls):
+        """Get full path for the SQLite profile store"""
+        os.makedirs(cls.DATA_DIR, exist_ok=True)
+        return os.path.join(cls.DATA_DIR, cls.PROFILES_DB)
+    
+    @classmethod
+    def get_export_path(cls, extension: str):
+        """Get a timestamped path for a profile export file"""
+        exports_dir = os.path.join(cls.DATA_DIR, cls.EXPORTS_DIR)
+        os.makedirs(exports_dir, exist_ok=True)
+        return os.path.join(exports_dir, f"linkedin_profiles_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}")
@@ -0,0 +1,199 @@
+"""
+Profile Extraction Engine - parses a single page snapshot locally
+Every field is read from one `page_source` string with lxml, so a profile costs
+one WebDriver round-trip instead of one per selector, and can be tested offline
+against saved HTML.
+"""
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+from lxml import html as lxml_html
+
+LINKEDIN_BASE_URL = "https://www.linkedin.com"
+
+
+def has_class(class_name: str) -> str:
+    """XPath predicate equivalent to the CSS `.class_name` selector"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+# Selector chains per field, tried in order (XPath equivalents of the old Selenium selectors)
+FIELD_SELECTORS: Dict[str, List[str]] = {
+    'name': [
+        f"//h1[{has_class('text-heading-xlarge')}]",
+        "//h1[contains(@class, 'inline')]",
+        "//main//h1",
+    ],
+    'headline': [
+        f"//div[{has_class('text-body-medium')} and {has_class('break-words')}]",
+        "//main//div[contains(@class, 'text-body-medium')]",
+    ],
+    'location': [
+        f"//span[{has_class('text-body-small')} and {has_class('inline')} and {has_class('t-black--light')} and {has_class('break-words')}]",
+        "//main//span[contains(@class, 'text-body-small')]",
+    ],
+}
+
+# First entry of the experience section (the `experience` id sits on an anchor inside the section)
+EXPERIENCE_ITEM_SELECTOR = (
+    f"//*[@id='experience']//li[{has_class('artdeco-list__item')}]"
+    f" | //section[.//*[@id='experience']]//li[{has_class('artdeco-list__item')}]"
+)
+EXPERIENCE_TITLE_SELECTOR = ".//div[contains(@class, 'display-flex')]//span[@aria-hidden='true']"
+EXPERIENCE_COMPANY_SELECTOR = f".//span[{has_class('t-14')} and {has_class('t-normal')}]//span[@aria-hidden='true']"
+
+
+def empty_profile() -> Dict:
+    """Return a profile dict with every field blank"""
+    return {
+        'name': '',
+        'headline': '',
+        'location': '',
+        'current_company': '',
+        'current_position': ''
+    }
+
+
+def parse_html(page_source: str):
+    """Parse an HTML snapshot into an lxml tree"""
+    return lxml_html.fromstring(page_source or '<html></html>')
+
+
+def node_text(node) -> str:
+    """Whitespace-normalized text content of a node"""
+    return ' '.join(node.text_content().split())
+
+
+def selector_text(tree, selector: str) -> str:
+    """Return the text of the first non-empty match for one selector"""
+    for node in tree.xpath(selector):
+        text = node_text(node)
+        if text:
+            return text
+    return ''
+
+
+def first_text(tree, selectors: List[str]) -> str:
+    """Return the text of the first non-empty match across a selector chain"""
+    for selector in selectors:
+        text = selector_text(tree, selector)
+        if text:
+            return text
+    return ''
+
+
+def field_text(tree, field: str, registry=None) -> str:
+    """
+    Extract one field using its selector chain
+    With a SelectorRegistry, the chain is tried best-first and every lookup is recorded;
+    on probe rounds the rest of the chain is evaluated too, to keep its statistics current.
+    """
+    selectors = FIELD_SELECTORS[field]
+    if registry is None:
+        return first_text(tree, selectors)
+
+    probe = registry.should_probe(field)
+    result = ''
+    for selector in registry.ordered(field, selectors):
+        text = selector_text(tree, selector)
+        registry.record(field, selector, bool(text))
+        if text and not result:
+            result = text
+            if not probe:
+                break
+    return result
+
+
+def extract_experience(tree) -> tuple[str, str]:
+    """
+    Read the first position from the experience section
+    Returns: (position, company)
+    """
+    items = tree.xpath(EXPERIENCE_ITEM_SELECTOR)
+    if not items:
+        return '', ''
+
+    first_position = items[0]
+    position = first_text(first_position, [EXPERIENCE_TITLE_SELECTOR])
+    company = first_text(first_position, [EXPERIENCE_COMPANY_SELECTOR])
+    return position, company
+
+
+def extract_profile(page_source: str, registry=None) -> Dict:
+    """
+    Extract profile fields from a profile page snapshot
+    Pass a SelectorRegistry to order selector chains by past hit rate and record lookups.
+    Returns: Dictionary with profile data (Name, Headline, Location, Current Company, Current Position)
+    """
+    tree = parse_html(page_source)
+    profile_data = empty_profile()
+
+    for field in FIELD_SELECTORS:
+        profile_data[field] = field_text(tree, field, registry)
+
+    # Current role as listed in the experience section; headline splitting and
+    # cleanup happen in batch in postprocess.py
+    position, company = extract_experience(tree)
+    profile_data['current_position'] = position
+    profile_data['current_company'] = company
+
+    return profile_data
+
+
+def normalize_profile_url(href: Optional[str]) -> Optional[str]:
+    """
+    Canonicalize a profile link to https://www.linkedin.com/in/<slug>
+    Drops query strings, fragments, trailing slashes and sub-pages.
+    Returns: canonical URL, or None if the link is not a member profile
+    """
+    if not href:
+        return None
+
+    href = href.strip()
+    if href.startswith('/'):
+        href = f"{LINKEDIN_BASE_URL}{href}"
+
+    parts = urlsplit(href)
+    host = parts.netloc.lower()
+    if host != 'linkedin.com' and not host.endswith('.linkedin.com'):
+        return None
+
+    # miniProfile URNs point at the same person through an internal id
+    if '/in/' not in parts.path or 'miniprofile' in parts.path.lower():
+        return None
+
+    slug = parts.path.split('/in/', 1)[1].split('/', 1)[0]
+    if not slug:
+        return None
+
+    return f"{LINKEDIN_BASE_URL}/in/{slug}"
+
+
+def add_profile_urls(hrefs: Iterable[str], profile_urls: List[str], seen: Set[str], max_profiles: int) -> int:
+    """
+    Normalize hrefs and append unseen profiles to profile_urls in order
+    Returns: number of profiles added
+    """
+    added = 0
+    for href in hrefs:
+        if len(profile_urls) >= max_profiles:
+            break
+
+        profile_url = normalize_profile_url(href)
+        if profile_url and profile_url not in seen:
+            seen.add(profile_url)
+            profile_urls.append(profile_url)
+            added += 1
+    return added
+
+
+def extract_profile_links(page_source: str) -> List[Tuple[str, str]]:
+    """
+    Return every profile-looking link in a search results snapshot
+    Returns: (href, snippet) pairs, where snippet is the text of the enclosing result card
+    """
+    tree = parse_html(page_source)
+    links = []
+    for anchor in tree.xpath("//a[contains(@href, '/in/')]"):
+        cards = anchor.xpath("ancestor::li[1]")
+        links.append((anchor.get('href'), node_text(cards[0]) if cards else ''))
+    return links
@@ -0,0 +1,40 @@
+"""
+Pacing scheduler - polite spacing between page navigations
+Page readiness is handled by explicit waits in the scraper; this module only
+enforces the Config.MIN_DELAY/MAX_DELAY interval between navigations. Time
+already spent loading and parsing the previous page counts towards the
+interval, so slow pages are not followed by a full extra delay.
+"""
+import random
+import time
+from config import Config
+
+
+class PacingScheduler:
+    """Enforces a random minimum interval between consecutive navigation starts"""
+
+    def __init__(self, min_delay: float = None, max_delay: float = None, sleep=time.sleep, clock=time.monotonic):
+        self.min_delay = min_delay if min_delay is not None else Config.MIN_DELAY
+        self.max_delay = max_delay if max_delay is not None else Config.MAX_DELAY
+        self.sleep = sleep
+        self.clock = clock
+        self.last_navigation = None
+        self.interval = 0.0
+        self.total_waited = 0.0
+
+    def wait(self) -> float:
+        """
+        Block until the next navigation may start, then record it
+        Returns: seconds slept
+        """
+        slept = 0.0
+        if self.last_navigation is not None:
+            remaining = self.interval - (self.clock() - self.last_navigation)
+            if remaining > 0:
+                self.sleep(remaining)
+                slept = remaining
+
+        self.total_waited += slept
+        self.last_navigation = self.clock()
+        self.interval = random.uniform(self.min_delay, self.max_delay)
+        return slept
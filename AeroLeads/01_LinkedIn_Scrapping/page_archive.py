@@ -0,0 +1,79 @@
+"""
+Raw page archive - content-addressed store of fetched profile pages
+Each page is gzip-compressed and stored under its SHA-256 digest, so identical
+snapshots are kept once. An append-only index maps profile URLs to the digests
+fetched for them, letting reextract.py re-run extraction offline when the
+selectors change.
+"""
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterator, Tuple
+from config import Config
+from extractor import normalize_profile_url
+
+INDEX_FILE = "index.jsonl"
+
+
+class PageArchive:
+    """Gzip-compressed HTML snapshots keyed by content hash, plus a URL index"""
+
+    def __init__(self, root: str = None):
+        self.root = root or Config.get_archive_dir()
+        os.makedirs(self.root, exist_ok=True)
+        self.index_path = os.path.join(self.root, INDEX_FILE)
+
+    def path_for(self, digest: str) -> str:
+        """Blob path for a digest, fanned out by its first two hex characters"""
+        return os.path.join(self.root, digest[:2], f"{digest}.html.gz")
+
+    def store(self, profile_url: str, page_source: str) -> str:
+        """
+        Archive a page snapshot and index it under the profile URL
+        Returns: SHA-256 digest of the page
+        """
+        data = page_source.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        entry = {
+            'profile_url': normalize_profile_url(profile_url) or profile_url,
+            'sha256': digest,
+            'fetched_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+        return digest
+
+    def load(self, digest: str) -> str:
+        """Read an archived page back as text"""
+        with gzip.open(self.path_for(digest), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def latest(self) -> Dict[str, Dict]:
+        """Most recent index entry per profile URL"""
+        entries: Dict[str, Dict] = {}
+        if not os.path.exists(self.index_path):
+            return entries
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entries[entry['profile_url']] = entry
+        return entries
+
+    def iter_latest(self) -> Iterator[Tuple[str, str, str]]:
+        """Yield (profile_url, blob path, fetched_at) for the newest snapshot of each profile"""
+        for profile_url, entry in self.latest().items():
+            yield profile_url, self.path_for(entry['sha256']), entry['fetched_at']
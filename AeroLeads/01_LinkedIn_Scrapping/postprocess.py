@@ -0,0 +1,154 @@
+"""
+Post-processing - batch cleanup of collected profile records
+Extraction keeps the values as they appear on the page; this stage cleans a
+whole table of records at once with vectorized pandas string operations:
+whitespace cleanup, "Position at Company" headline splitting, company and
+location normalization, and deduplication by canonical profile URL. The records
+of a scrape run are cleaned together once the run has stored them, and the
+journal is cleaned on compaction.
+Re-run it over the whole stored dataset whenever the rules change:
+
+    python postprocess.py
+"""
+import time
+from typing import Dict, List, Tuple
+import pandas as pd
+from extractor import LINKEDIN_BASE_URL
+from profile_store import ProfileStore, PROFILE_COLUMNS
+
+TEXT_COLUMNS = ['name', 'headline', 'location', 'current_company', 'current_position']
+
+# "Position at Company" / "Position @ Company"
+HEADLINE_SEPARATOR = r'\s+(?:at|@)\s+'
+
+# Trailing details after the company name, e.g. "Acme · Full-time" or "Acme | ex-Initech"
+COMPANY_SUFFIX = r'\s+[·•|]\s+.*$'
+
+# Member slug of a profile URL, whatever its host prefix, query or sub-page
+PROFILE_SLUG = r'linkedin\.com/in/([^/?#\s]+)'
+
+INSERT_PROFILE = f"""
+INSERT INTO profiles ({', '.join(PROFILE_COLUMNS)}, last_run_id)
+VALUES ({', '.join('?' for _ in PROFILE_COLUMNS)}, ?)
+"""
+
+
+def clean_text(series: pd.Series) -> pd.Series:
+    """Collapse runs of whitespace and trim; missing values become empty strings"""
+    return series.fillna('').astype(str).str.replace(r'\s+', ' ', regex=True).str.strip()
+
+
+def canonical_urls(urls: pd.Series) -> pd.Series:
+    """https://www.linkedin.com/in/<slug> for every profile URL (unrecognised URLs are kept as-is)"""
+    urls = clean_text(urls)
+    slugs = urls.str.extract(PROFILE_SLUG, expand=False)
+    return (f"{LINKEDIN_BASE_URL}/in/" + slugs).fillna(urls)
+
+
+def normalize_company(series: pd.Series) -> pd.Series:
+    """Drop employment-type and other trailing details, and stray separators"""
+    return clean_text(series).str.replace(COMPANY_SUFFIX, '', regex=True).str.strip(' ,-|·•')
+
+
+def normalize_location(series: pd.Series) -> pd.Series:
+    """Consistent ", " between location parts, no dangling commas"""
+    return clean_text(series).str.replace(r'\s*,\s*', ', ', regex=True).str.strip(' ,')
+
+
+def split_headlines(headlines: pd.Series) -> pd.DataFrame:
+    """
+    Split "Position at Company" headlines
+    Returns: DataFrame with position and company columns, empty where there is no separator
+    """
+    parts = headlines.str.split(HEADLINE_SEPARATOR, n=2, regex=True, expand=True)
+    position = parts[0] if 1 in parts else pd.Series('', index=headlines.index)
+    company = parts[1] if 1 in parts else pd.Series(None, index=headlines.index, dtype=object)
+    has_company = company.notna()
+    return pd.DataFrame({
+        'position': position.where(has_company, '').fillna('').str.strip(),
+        'company': company.fillna('').str.strip()
+    })
+
+
+def postprocess_profiles(df: pd.DataFrame, time_column: str = None) -> pd.DataFrame:
+    """
+    Clean a table of profile records and keep one row per person
+    Position and company come from the headline when it names both; otherwise the
+    values read from the experience section are kept. With time_column, the most
+    recent record per canonical URL wins, otherwise the last one.
+    Returns: cleaned copy of df
+    """
+    df = df.copy()
+    for column in TEXT_COLUMNS:
+        df[column] = clean_text(df[column]) if column in df else ''
+
+    headline = split_headlines(df['headline'])
+    df['current_position'] = headline['position'].where(headline['position'] != '', df['current_position'])
+    df['current_company'] = normalize_company(
+        headline['company'].where(headline['company'] != '', df['current_company']))
+    df['location'] = normalize_location(df['location'])
+
+    if 'profile_url' in df:
+        df['profile_url'] = canonical_urls(df['profile_url'])
+        if time_column and time_column in df:
+            df = df.sort_values(time_column, kind='stable')
+        df = df.drop_duplicates(subset='profile_url', keep='last')
+    return df.reset_index(drop=True)
+
+
+def postprocess_run(records: List[Tuple[str, Dict]], store: ProfileStore) -> int:
+    """
+    Clean the (profile_url, profile_data) records one run stored, in one pass, and write them back
+    Returns: number of profiles cleaned
+    """
+    if not records:
+        return 0
+    # stored_url keeps the key each record was stored under, whatever its canonical URL
+    df = postprocess_profiles(pd.DataFrame([dict(profile_data, profile_url=profile_url, stored_url=profile_url)
+                                            for profile_url, profile_data in records]))
+    store.update_profiles([(record['stored_url'], record) for record in df.to_dict('records')])
+    return len(df)
+
+
+def postprocess_store(store: ProfileStore = None) -> int:
+    """
+    Re-run post-processing over every stored profile, merging duplicate people
+    The earliest first-seen time of merged rows is kept. The table is read and
+    rewritten in one BEGIN IMMEDIATE transaction, so profiles a running scrape
+    upserts meanwhile wait for the rewrite instead of being lost by it. Reads the
+    whole table: meant for the command line, not for every run.
+    Returns: number of profiles after cleanup
+    """
+    store = store or ProfileStore()
+    store.conn.execute("BEGIN IMMEDIATE")
+    try:
+        df = pd.read_sql_query(f"SELECT {', '.join(PROFILE_COLUMNS)}, last_run_id FROM profiles", store.conn)
+        if df.empty:
+            store.conn.rollback()
+            return 0
+
+        first_seen = df.groupby(canonical_urls(df['profile_url']))['first_seen_at'].min()
+        cleaned = postprocess_profiles(df, 'last_fetched_at')
+        cleaned['first_seen_at'] = cleaned['profile_url'].map(first_seen)
+        cleaned['last_run_id'] = [int(run_id) if pd.notna(run_id) else None for run_id in cleaned['last_run_id']]
+
+        rows = cleaned[PROFILE_COLUMNS + ['last_run_id']].itertuples(index=False, name=None)
+        store.conn.execute("DELETE FROM profiles")
+        store.conn.executemany(INSERT_PROFILE, rows)
+        store.conn.commit()
+    except Exception:
+        store.conn.rollback()
+        raise
+    return len(cleaned)
+
+
+def main():
+    start = time.perf_counter()
+    store = ProfileStore()
+    count = postprocess_store(store)
+    store.close()
+    print(f"Post-processed {count} stored profiles in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
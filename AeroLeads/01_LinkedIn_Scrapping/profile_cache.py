@@ -0,0 +1,92 @@
+"""
+Persistent profile cache - skips re-scraping profiles fetched recently
+Records are keyed by canonical profile URL and stored with their fetch time in a
+JSON file under the data directory. Entries older than the TTL are ignored and
+the oldest entries are evicted once the cache grows past its size limit.
+"""
+import json
+import os
+import time
+from typing import Dict, Optional
+from config import Config
+from extractor import normalize_profile_url
+
+
+class ProfileCache:
+    """On-disk cache of scraped profile records with TTL and size-based eviction"""
+
+    def __init__(self, path: str = None, ttl_seconds: float = None, max_entries: int = None):
+        self.path = path or Config.get_cache_path()
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.PROFILE_CACHE_TTL_HOURS * 3600
+        self.max_entries = max_entries if max_entries is not None else Config.PROFILE_CACHE_MAX_ENTRIES
+        self.entries: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    @staticmethod
+    def key(profile_url: str) -> str:
+        """Cache key for a profile URL"""
+        return normalize_profile_url(profile_url) or profile_url
+
+    def load(self):
+        """Load cached entries from disk, starting empty if the file is missing or corrupt"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable profile cache {self.path}: {e}")
+            self.entries = {}
+
+    def save(self):
+        """Evict stale and excess entries, then write the cache to disk atomically"""
+        self.evict()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def is_fresh(self, entry: Dict) -> bool:
+        """Whether a cache entry is still within the TTL"""
+        return time.time() - entry.get('fetched_at', 0) <= self.ttl_seconds
+
+    def get(self, profile_url: str) -> Optional[Dict]:
+        """Return a copy of the cached record if it is fresh, counting the hit or miss"""
+        entry = self.entries.get(self.key(profile_url))
+        if entry and self.is_fresh(entry):
+            self.hits += 1
+            return dict(entry['record'])
+        self.misses += 1
+        return None
+
+    def put(self, profile_url: str, record: Dict):
+        """Store a freshly scraped record"""
+        self.entries[self.key(profile_url)] = {
+            'fetched_at': time.time(),
+            'record': record
+        }
+
+    def refresh(self, profile_url: str, record: Dict) -> bool:
+        """
+        Replace the record of a cached profile, keeping its fetch time (and so its TTL)
+        Returns: True if the profile was cached
+        """
+        entry = self.entries.get(self.key(profile_url))
+        if not entry:
+            return False
+        entry['record'] = record
+        return True
+
+    def evict(self):
+        """Drop expired entries, then the oldest ones until within max_entries"""
+        self.entries = {key: entry for key, entry in self.entries.items() if self.is_fresh(entry)}
+        overflow = len(self.entries) - self.max_entries
+        if overflow > 0:
+            oldest = sorted(self.entries, key=lambda key: self.entries[key].get('fetched_at', 0))
+            for key in oldest[:overflow]:
+                del self.entries[key]
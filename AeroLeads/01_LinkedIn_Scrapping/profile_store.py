@@ -0,0 +1,252 @@
+"""
+SQLite profile store - accumulated profiles, runs and fetch times
+A local database in WAL mode, so the Streamlit page can read while a run writes.
+Profiles are keyed by canonical URL and indexed on company and location, so the
+results view can filter and paginate without loading everything into pandas.
+CSV and Parquet exports stream rows from a query in batches.
+"""
+import csv
+import io
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+import pyarrow as pa
+import pyarrow.parquet as pq
+from config import Config
+from extractor import normalize_profile_url
+
+PROFILE_COLUMNS = ['profile_url', 'name', 'headline', 'location', 'current_company', 'current_position',
+                   'first_seen_at', 'last_fetched_at']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT,
+    location TEXT,
+    industry TEXT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    profiles_scraped INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    profile_url TEXT PRIMARY KEY,
+    name TEXT,
+    headline TEXT,
+    location TEXT COLLATE NOCASE,
+    current_company TEXT COLLATE NOCASE,
+    current_position TEXT,
+    first_seen_at TEXT NOT NULL,
+    last_fetched_at TEXT NOT NULL,
+    last_run_id INTEGER REFERENCES runs(id)
+);
+CREATE TABLE IF NOT EXISTS fetches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    profile_url TEXT NOT NULL,
+    run_id INTEGER REFERENCES runs(id),
+    fetched_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_profiles_company ON profiles(current_company);
+CREATE INDEX IF NOT EXISTS idx_profiles_location ON profiles(location);
+CREATE INDEX IF NOT EXISTS idx_profiles_last_fetched ON profiles(last_fetched_at);
+CREATE INDEX IF NOT EXISTS idx_fetches_profile ON fetches(profile_url);
+"""
+
+UPSERT_PROFILE = """
+INSERT INTO profiles (profile_url, name, headline, location, current_company, current_position,
+                      first_seen_at, last_fetched_at, last_run_id)
+VALUES (:profile_url, :name, :headline, :location, :current_company, :current_position,
+        :fetched_at, :fetched_at, :run_id)
+ON CONFLICT(profile_url) DO UPDATE SET
+    name = excluded.name,
+    headline = excluded.headline,
+    location = excluded.location,
+    current_company = excluded.current_company,
+    current_position = excluded.current_position,
+    last_fetched_at = excluded.last_fetched_at,
+    last_run_id = excluded.last_run_id
+"""
+
+# Re-extracted records replace stored values unless the profile was fetched again
+# after the archived snapshot; the fetch time and run are left as they were
+UPDATE_REEXTRACTED = """
+INSERT INTO profiles (profile_url, name, headline, location, current_company, current_position,
+                      first_seen_at, last_fetched_at)
+VALUES (:profile_url, :name, :headline, :location, :current_company, :current_position,
+        :fetched_at, :fetched_at)
+ON CONFLICT(profile_url) DO UPDATE SET
+    name = excluded.name,
+    headline = excluded.headline,
+    location = excluded.location,
+    current_company = excluded.current_company,
+    current_position = excluded.current_position
+WHERE excluded.last_fetched_at >= profiles.last_fetched_at
+"""
+
+# Cleaned values of stored profiles; the fetch time and run are left as they were
+UPDATE_CLEANED = """
+UPDATE profiles SET
+    name = :name,
+    headline = :headline,
+    location = :location,
+    current_company = :current_company,
+    current_position = :current_position
+WHERE profile_url = :profile_url
+"""
+
+
+def now() -> str:
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class ProfileStore:
+    """Thin wrapper around the profiles database"""
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.get_db_path()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def start_run(self, job_id: str = None, location: str = "", industry: str = "") -> int:
+        """Record the start of a scrape run; returns its id"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (job_id, location, industry, started_at) VALUES (?, ?, ?, ?)",
+                (job_id, location, industry, now()))
+        return cursor.lastrowid
+
+    def finish_run(self, run_id: int, profiles_scraped: int):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE runs SET finished_at = ?, profiles_scraped = ? WHERE id = ?",
+                (now(), profiles_scraped, run_id))
+
+    def upsert_profiles(self, records: List[Tuple[str, Dict]], run_id: Optional[int] = None,
+                        fetched_at: str = None):
+        """Insert or update (profile_url, profile_data) pairs and log their fetch in one transaction"""
+        fetched_at = fetched_at or now()
+        rows = []
+        for profile_url, profile_data in records:
+            row = {column: profile_data.get(column, '') for column in PROFILE_COLUMNS[1:6]}
+            row.update(profile_url=normalize_profile_url(profile_url) or profile_url,
+                       fetched_at=profile_data.get('scraped_at') or fetched_at, run_id=run_id)
+            rows.append(row)
+
+        with self.conn:
+            self.conn.executemany(UPSERT_PROFILE, rows)
+            self.conn.executemany(
+                "INSERT INTO fetches (profile_url, run_id, fetched_at) VALUES (:profile_url, :run_id, :fetched_at)",
+                rows)
+
+    def upsert_profile(self, profile_url: str, profile_data: Dict, run_id: Optional[int] = None):
+        self.upsert_profiles([(profile_url, profile_data)], run_id)
+
+    def update_reextracted(self, records: List[Tuple[str, Dict, str]]):
+        """
+        Store (profile_url, profile_data, fetched_at) records re-extracted from archived pages
+        Unlike upsert_profiles, no fetch is logged: the data is from the original fetch.
+        """
+        rows = []
+        for profile_url, profile_data, fetched_at in records:
+            row = {column: profile_data.get(column, '') for column in PROFILE_COLUMNS[1:6]}
+            row.update(profile_url=normalize_profile_url(profile_url) or profile_url, fetched_at=fetched_at)
+            rows.append(row)
+        with self.conn:
+            self.conn.executemany(UPDATE_REEXTRACTED, rows)
+
+    def update_profiles(self, records: List[Tuple[str, Dict]]):
+        """Replace the fields of stored (profile_url, profile_data) records, without logging a fetch"""
+        rows = []
+        for profile_url, profile_data in records:
+            row = {column: profile_data.get(column, '') for column in PROFILE_COLUMNS[1:6]}
+            row.update(profile_url=normalize_profile_url(profile_url) or profile_url)
+            rows.append(row)
+        with self.conn:
+            self.conn.executemany(UPDATE_CLEANED, rows)
+
+    @staticmethod
+    def where_clause(search: str = "", company: str = "", location: str = "") -> Tuple[str, list]:
+        """SQL filter for the results view (prefix matches can use the company/location indexes)"""
+        conditions, params = [], []
+        if company:
+            conditions.append("current_company LIKE ?")
+            params.append(f"{company}%")
+        if location:
+            conditions.append("location LIKE ?")
+            params.append(f"{location}%")
+        if search:
+            conditions.append("(name LIKE ? OR headline LIKE ?)")
+            params.extend([f"%{search}%", f"%{search}%"])
+        return (" WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+    def count_profiles(self, search: str = "", company: str = "", location: str = "") -> int:
+        where, params = self.where_clause(search, company, location)
+        return self.conn.execute(f"SELECT COUNT(*) FROM profiles{where}", params).fetchone()[0]
+
+    def query_profiles(self, limit: int = 50, offset: int = 0, search: str = "",
+                       company: str = "", location: str = "") -> List[Dict]:
+        """One page of profiles, most recently fetched first"""
+        where, params = self.where_clause(search, company, location)
+        rows = self.conn.execute(
+            f"SELECT {', '.join(PROFILE_COLUMNS)} FROM profiles{where} "
+            f"ORDER BY last_fetched_at DESC LIMIT ? OFFSET ?",
+            params + [limit, offset])
+        return [dict(row) for row in rows]
+
+    def get_profiles(self, profile_urls: List[str]) -> List[Dict]:
+        """Profiles for specific URLs (e.g. those scraped in the current run)"""
+        keys = [normalize_profile_url(url) or url for url in profile_urls]
+        if not keys:
+            return []
+        placeholders = ', '.join('?' for _ in keys)
+        rows = self.conn.execute(
+            f"SELECT {', '.join(PROFILE_COLUMNS)} FROM profiles WHERE profile_url IN ({placeholders})", keys)
+        return [dict(row) for row in rows]
+
+    def iter_batches(self, batch_size: int = 1000, search: str = "", company: str = "",
+                     location: str = "") -> Iterator[List[tuple]]:
+        """Stream matching profile rows in batches"""
+        where, params = self.where_clause(search, company, location)
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(PROFILE_COLUMNS)} FROM profiles{where} ORDER BY profile_url", params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield [tuple(row) for row in rows]
+
+    def iter_csv(self, batch_size: int = 1000, **filters) -> Iterator[str]:
+        """Yield a CSV export chunk by chunk (header first)"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(PROFILE_COLUMNS)
+        for rows in self.iter_batches(batch_size, **filters):
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def export_csv(self, path: str, **filters) -> str:
+        """Stream matching profiles to a CSV file"""
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            for chunk in self.iter_csv(**filters):
+                f.write(chunk)
+        return path
+
+    def export_parquet(self, path: str, batch_size: int = 1000, **filters) -> str:
+        """Stream matching profiles to a Parquet file, one row group per batch"""
+        schema = pa.schema([(column, pa.string()) for column in PROFILE_COLUMNS])
+        with pq.ParquetWriter(path, schema) as writer:
+            for rows in self.iter_batches(batch_size, **filters):
+                columns = list(zip(*rows))
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(column, type=pa.string()) for column in columns], schema=schema))
+        return path
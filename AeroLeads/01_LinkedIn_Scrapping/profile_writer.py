@@ -0,0 +1,125 @@
+"""
+Streaming profile writer - crash-safe, incremental CSV output
+Each record is appended to a journal file and flushed as soon as it is scraped,
+with fsync every few records, so a crash loses at most the profile in flight and
+earlier runs are never overwritten. `compact` merges the journal into the final
+deduplicated CSV at the end of a run and then discards it, so the journal only
+ever holds records that are not in the CSV yet and compaction does not re-read
+the history of every past run.
+"""
+import csv
+import glob
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List
+import pandas as pd
+from config import Config
+from profile_cache import ProfileCache
+from postprocess import postprocess_profiles
+
+FIELDNAMES = ['profile_url', 'name', 'headline', 'location', 'current_company', 'current_position', 'scraped_at']
+
+# Suffix of journals set aside for compaction (left behind only if compaction crashed)
+ROTATED_SUFFIX = '.compacting'
+
+
+class ProfileWriter:
+    """Append-only profile journal with batched fsync and end-of-run compaction"""
+
+    # Shared by the writers of every scrape worker thread: appends and journal
+    # rotation never interleave, and a rotation makes open writers reopen the journal
+    _lock = threading.Lock()
+    _rotations = 0
+    _compact_lock = threading.Lock()
+
+    def __init__(self, journal_path: str = None, output_path: str = None, fsync_batch: int = None):
+        self.journal_path = journal_path or Config.get_journal_path()
+        self.output_path = output_path or Config.get_output_path()
+        self.fsync_batch = fsync_batch or Config.OUTPUT_FSYNC_BATCH
+        self.pending = 0
+        with ProfileWriter._lock:
+            self.open_journal()
+
+    def open_journal(self):
+        """Open the current journal for appending (lock held)"""
+        is_new = not os.path.exists(self.journal_path) or os.path.getsize(self.journal_path) == 0
+        self.file = open(self.journal_path, 'a', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=FIELDNAMES, extrasaction='ignore')
+        self.rotation = ProfileWriter._rotations
+        if is_new:
+            self.writer.writeheader()
+            self.sync()
+
+    def write(self, profile_url: str, profile_data: Dict, scraped_at: str = None):
+        """Append one record and flush it; fsync once a batch has accumulated"""
+        key = ProfileCache.key(profile_url)
+        scraped_at = scraped_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        record = dict(profile_data, profile_url=key, scraped_at=scraped_at)
+        with ProfileWriter._lock:
+            if self.rotation != ProfileWriter._rotations:
+                # Another writer compacted the journal this file was appending to
+                self.close()
+                self.open_journal()
+            self.writer.writerow(record)
+            self.file.flush()
+
+            self.pending += 1
+            if self.pending >= self.fsync_batch:
+                self.sync()
+
+    def sync(self):
+        """Force buffered records to disk"""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+
+    def close(self):
+        """Sync outstanding records and close the journal"""
+        if not self.file.closed:
+            self.sync()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def rotate(self) -> List[str]:
+        """
+        Set the journal aside for compaction; later writes start a new journal
+        Returns: every set-aside journal, oldest first (including any a crashed compaction left)
+        """
+        with ProfileWriter._lock:
+            if os.path.exists(self.journal_path):
+                os.replace(self.journal_path, f"{self.journal_path}.{time.time_ns()}{ROTATED_SUFFIX}")
+                ProfileWriter._rotations += 1
+        return sorted(glob.glob(f"{glob.escape(self.journal_path)}.*{ROTATED_SUFFIX}"))
+
+    def compact(self) -> str:
+        """
+        Merge the journal into the output CSV (latest record per profile) and discard it
+        The record with the newest scraped_at wins, so a re-extracted archive page
+        (journaled with its original fetch time) never replaces a later scrape; on a
+        tie the journaled record wins. Only the existing CSV, one row per profile, and
+        the records journaled since the last compaction are read. A crash before the
+        journal is removed is harmless: it is merged again by the next compaction.
+        Returns: path of the output file
+        """
+        with ProfileWriter._compact_lock:
+            journals = self.rotate()
+            frames = [pd.read_csv(path, dtype=str, keep_default_na=False, on_bad_lines='skip')
+                      for path in ([self.output_path] if os.path.exists(self.output_path) else []) + journals]
+            if not frames:
+                return self.output_path
+            df = postprocess_profiles(pd.concat(frames, ignore_index=True),
+                                      time_column='scraped_at').reindex(columns=FIELDNAMES)
+
+            tmp_path = f"{self.output_path}.tmp"
+            df.to_csv(tmp_path, index=False, encoding='utf-8')
+            os.replace(tmp_path, self.output_path)
+            for path in journals:
+                os.remove(path)
+        return self.output_path
@@ -0,0 +1,104 @@
+"""
+Offline re-extraction - re-parse every archived profile page in parallel
+Run after changing selectors in extractor.py to rebuild the profile dataset from
+the raw page archive, without opening a browser:
+
+    python reextract.py [--workers N]
+
+Records keep their original fetch time. They are written to the profile store
+(the source of the results view and exports) and the output journal, which is
+then compacted, and cached copies of the profiles are refreshed, so the next
+scrape does not serve the old values from the cache.
+"""
+import argparse
+import gzip
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from extractor import extract_profile
+from page_archive import PageArchive
+from postprocess import postprocess_profiles
+from profile_cache import ProfileCache
+from profile_store import ProfileStore
+from profile_writer import ProfileWriter
+
+# Re-extracted records written to the store per transaction
+STORE_BATCH = 500
+
+
+def extract_archived(item: Tuple[str, str, str]) -> Tuple[str, str, Optional[Dict]]:
+    """Worker: decompress one archived page and extract its fields"""
+    profile_url, path, fetched_at = item
+    try:
+        with gzip.open(path, 'rb') as f:
+            page_source = f.read().decode('utf-8')
+        return profile_url, fetched_at, extract_profile(page_source)
+    except Exception as e:
+        print(f"Could not re-extract {profile_url}: {e}")
+        return profile_url, fetched_at, None
+
+
+def store_batch(batch: List[Tuple[str, str, Dict]], store: ProfileStore, cache: ProfileCache):
+    """Post-process a batch of re-extracted records into the store and refresh their cache entries"""
+    for profile_url, _, profile_data in batch:
+        cache.refresh(profile_url, profile_data)
+    df = postprocess_profiles(pd.DataFrame(
+        [dict(profile_data, profile_url=profile_url, fetched_at=fetched_at)
+         for profile_url, fetched_at, profile_data in batch]))
+    store.update_reextracted([(record['profile_url'], record, record['fetched_at'])
+                              for record in df.to_dict('records')])
+
+
+def reextract_archive(workers: int = None, archive: PageArchive = None, store: ProfileStore = None,
+                      cache: ProfileCache = None) -> Tuple[int, str]:
+    """
+    Re-extract the newest archived snapshot of every profile across a process pool
+    Returns: (profiles re-extracted, output file path)
+    """
+    archive = archive or PageArchive()
+    items = list(archive.iter_latest())
+    if not items:
+        return 0, ''
+
+    store = store or ProfileStore()
+    cache = cache or ProfileCache()
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(items) // (workers * 4))
+    count = 0
+    batch = []
+
+    with ProfileWriter() as writer, ProcessPoolExecutor(max_workers=workers) as pool:
+        for profile_url, fetched_at, profile_data in pool.map(extract_archived, items, chunksize=chunksize):
+            if profile_data:
+                writer.write(profile_url, profile_data, scraped_at=fetched_at)
+                batch.append((profile_url, fetched_at, profile_data))
+                count += 1
+            if len(batch) >= STORE_BATCH:
+                store_batch(batch, store, cache)
+                batch = []
+        if batch:
+            store_batch(batch, store, cache)
+
+    cache.save()
+    return count, writer.compact()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract profiles from the raw page archive")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count, filename = reextract_archive(args.workers)
+    elapsed = time.perf_counter() - start
+
+    if count:
+        print(f"Re-extracted {count} profiles in {elapsed:.2f}s. Data saved to {filename}")
+    else:
+        print("Archive is empty - enable Archive Raw Pages and run the scraper first")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Run tracing - where a scrape run spends its time
+Spans time the phases of a run (browser startup, login, pacing delays, page
+loads, waits, scrolling, extraction...) and counters tally events such as
+WebDriver round-trips and failed selector lookups. Spans nest: each records its
+total time and its self time (total minus nested spans), so the self times add
+up to the traced wall-clock time and can be charted as a breakdown. The report
+is written as JSON next to the output CSV.
+"""
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List
+
+
+class RunTrace:
+    """Span timings, counters and per-profile costs for one scrape run"""
+
+    def __init__(self):
+        self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.started = time.perf_counter()
+        self.spans: Dict[str, Dict] = {}
+        self.counters: Dict[str, int] = {}
+        self.profiles: List[Dict] = []
+        self._stack: List[List[float]] = []
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time a block under name; time spent in nested spans is excluded from its self time"""
+        frame = [time.perf_counter(), 0.0]  # [start, seconds spent in child spans]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            seconds = time.perf_counter() - frame[0]
+            if self._stack:
+                self._stack[-1][1] += seconds
+
+            entry = self.spans.setdefault(name, {'count': 0, 'seconds': 0.0, 'self_seconds': 0.0, 'max_seconds': 0.0})
+            entry['count'] += 1
+            entry['seconds'] += seconds
+            entry['self_seconds'] += seconds - frame[1]
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_profile(self, profile_url: str, seconds: float, round_trips: int, selector_misses: int):
+        """Record the cost of scraping one profile"""
+        self.profiles.append({
+            'profile_url': profile_url,
+            'seconds': round(seconds, 3),
+            'round_trips': round_trips,
+            'selector_misses': selector_misses
+        })
+
+    def breakdown(self) -> Dict[str, float]:
+        """Self time per span plus untraced time, in seconds (sums to the run's wall-clock time)"""
+        phases = {name: round(entry['self_seconds'], 3) for name, entry in self.spans.items()}
+        phases['untraced'] = round(max(0.0, self.elapsed() - sum(phases.values())), 3)
+        return phases
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def report(self, **extra) -> Dict:
+        """JSON-serialisable summary of the run"""
+        profiles = len(self.profiles)
+        report = {
+            'started_at': self.started_at,
+            'total_seconds': round(self.elapsed(), 3),
+            'breakdown': self.breakdown(),
+            'spans': {name: {key: round(value, 3) if isinstance(value, float) else value
+                             for key, value in entry.items()}
+                      for name, entry in self.spans.items()},
+            'counters': dict(self.counters),
+            'profiles_fetched': profiles,
+            'round_trips_per_profile': (round(sum(p['round_trips'] for p in self.profiles) / profiles, 1)
+                                        if profiles else 0),
+            'profiles': self.profiles
+        }
+        report.update(extra)
+        return report
+
+    def save(self, path: str, report: Dict = None) -> str:
+        """Write the report (built now unless given) to path"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report or self.report(), f, indent=2)
+        return path
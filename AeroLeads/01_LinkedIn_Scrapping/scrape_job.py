@@ -0,0 +1,129 @@
+"""
+Resumable scrape jobs - checkpointed URL frontier
+A job records its search filters, the profile URLs discovered by search_profiles
+and which of them have been scraped or have failed. The checkpoint is rewritten
+after every profile, so an interrupted run can resume without searching again.
+Failed profiles are retried on resume until they have failed
+Config.MAX_PROFILE_ATTEMPTS times, after which the job can complete without them.
+"""
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+from config import Config
+
+
+class ScrapeJob:
+    """A scrape run whose progress is persisted to data/jobs/<job_id>.json"""
+
+    def __init__(self, job_id: str, location: str = "", industry: str = "", max_profiles: int = 20):
+        self.job_id = job_id
+        self.location = location
+        self.industry = industry
+        self.max_profiles = max_profiles
+        self.frontier: List[str] = []
+        self.completed: List[str] = []
+        self.failed: Dict[str, int] = {}  # profile URL -> failed attempts
+        self.status = 'searching'
+        self.created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.updated_at = self.created_at
+
+    @staticmethod
+    def path_for(job_id: str) -> str:
+        """Checkpoint file path for a job id"""
+        return os.path.join(Config.get_jobs_dir(), f"{job_id}.json")
+
+    @classmethod
+    def create(cls, location: str = "", industry: str = "", max_profiles: int = 20) -> 'ScrapeJob':
+        """Start a new job and write its first checkpoint"""
+        job_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        job = cls(job_id, location, industry, max_profiles)
+        job.save()
+        return job
+
+    @classmethod
+    def load(cls, job_id: str) -> Optional['ScrapeJob']:
+        """Load a job from its checkpoint, or None if it does not exist"""
+        path = cls.path_for(job_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+
+        job = cls(data['job_id'], data.get('location', ''), data.get('industry', ''), data.get('max_profiles', 20))
+        job.frontier = data.get('frontier', [])
+        job.completed = data.get('completed', [])
+        failed = data.get('failed', {})
+        # Older checkpoints list failed URLs without counting attempts
+        job.failed = dict.fromkeys(failed, 1) if isinstance(failed, list) else failed
+        job.status = data.get('status', 'searching')
+        job.created_at = data.get('created_at', job.created_at)
+        job.updated_at = data.get('updated_at', job.updated_at)
+        return job
+
+    @classmethod
+    def list_unfinished(cls) -> List['ScrapeJob']:
+        """All jobs that have not completed, most recent first"""
+        jobs = []
+        for filename in sorted(os.listdir(Config.get_jobs_dir()), reverse=True):
+            if filename.endswith('.json'):
+                job = cls.load(filename[:-len('.json')])
+                if job and job.status != 'completed':
+                    jobs.append(job)
+        return jobs
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.job_id,
+            'location': self.location,
+            'industry': self.industry,
+            'max_profiles': self.max_profiles,
+            'frontier': self.frontier,
+            'completed': self.completed,
+            'failed': self.failed,
+            'status': self.status,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+    def save(self):
+        """Write the checkpoint atomically"""
+        self.updated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        path = self.path_for(self.job_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    @property
+    def has_frontier(self) -> bool:
+        """Whether the search phase has already run for this job"""
+        return self.status != 'searching'
+
+    def set_frontier(self, profile_urls: List[str]):
+        """Record the URLs discovered by the search phase"""
+        self.frontier = list(profile_urls)
+        self.status = 'scraping'
+        self.save()
+
+    def pending(self) -> List[str]:
+        """Frontier URLs not scraped yet (failed ones are retried until they run out of attempts)"""
+        done = set(self.completed)
+        done.update(url for url, attempts in self.failed.items() if attempts >= Config.MAX_PROFILE_ATTEMPTS)
+        return [url for url in self.frontier if url not in done]
+
+    def mark_completed(self, profile_url: str):
+        self.failed.pop(profile_url, None)
+        self.completed.append(profile_url)
+        self.save()
+
+    def mark_failed(self, profile_url: str):
+        self.failed[profile_url] = self.failed.get(profile_url, 0) + 1
+        self.save()
+
+    def finish(self):
+        """Mark the job completed once nothing is left to scrape"""
+        if not self.pending():
+            self.status = 'completed'
+        self.save()
@@ -0,0 +1,185 @@
+"""
+Background scrape worker - runs scrapes off the Streamlit script thread
+The page submits a task and returns immediately. Worker threads pull task ids
+from a queue and call run_scraper, writing progress, the result and any CAPTCHA
+prompt to a SQLite task table. Every Streamlit session polls that table, so the
+UI never blocks and a CAPTCHA is confirmed with a button instead of input() on
+the server's terminal. Tasks left queued or running by a restarted server are
+picked up again and resume from their job checkpoint.
+"""
+import json
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from config import Config
+from scrape_job import ScrapeJob
+from scraper import run_scraper
+
+ACTIVE_STATES = ('queued', 'running', 'captcha')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    params TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    progress_current INTEGER DEFAULT 0,
+    progress_total INTEGER DEFAULT 0,
+    message TEXT DEFAULT '',
+    captcha_solved INTEGER DEFAULT 0,
+    success INTEGER,
+    result_message TEXT,
+    run_stats TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_state ON tasks(state);
+"""
+
+
+def now() -> str:
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class TaskStore:
+    """Scrape task state shared between the worker and every page session"""
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.get_tasks_db_path()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self.lock = threading.Lock()
+
+    def create(self, job_id: str, params: Dict) -> int:
+        """Queue a task for a job; returns the task id"""
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO tasks (job_id, params, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (job_id, json.dumps(params), now(), now()))
+        return cursor.lastrowid
+
+    def get(self, task_id: int) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        if not row:
+            return None
+        task = dict(row)
+        task['params'] = json.loads(task['params'])
+        task['run_stats'] = json.loads(task['run_stats']) if task['run_stats'] else {}
+        return task
+
+    def update(self, task_id: int, **fields):
+        """Set task columns (state, progress, result...) and bump updated_at"""
+        fields['updated_at'] = now()
+        assignments = ', '.join(f"{column} = ?" for column in fields)
+        with self.lock, self.conn:
+            self.conn.execute(f"UPDATE tasks SET {assignments} WHERE id = ?", list(fields.values()) + [task_id])
+
+    def unfinished(self) -> List[int]:
+        """Ids of tasks still queued or running, oldest first"""
+        placeholders = ', '.join('?' for _ in ACTIVE_STATES)
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT id FROM tasks WHERE state IN ({placeholders}) ORDER BY id", ACTIVE_STATES)
+            return [row['id'] for row in rows]
+
+    def confirm_captcha(self, task_id: int):
+        """Called from the page once the user has solved the CAPTCHA in the browser"""
+        self.update(task_id, captcha_solved=1)
+
+    def take_captcha_confirmation(self, task_id: int) -> bool:
+        """Whether the CAPTCHA was confirmed, clearing the flag"""
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "UPDATE tasks SET captcha_solved = 0 WHERE id = ? AND captcha_solved = 1", (task_id,))
+        return cursor.rowcount > 0
+
+
+class ScrapeWorker:
+    """Queue of scrape tasks served by a small pool of daemon threads"""
+
+    def __init__(self, workers: int = None, browser_session=None, tasks: TaskStore = None):
+        self.tasks = tasks or TaskStore()
+        self.browser_session = browser_session
+        self.queue: queue.Queue = queue.Queue()
+
+        # Pick up tasks a previous server process did not finish
+        for task_id in self.tasks.unfinished():
+            self.tasks.update(task_id, state='queued', message="Waiting for a worker...")
+            self.queue.put(task_id)
+
+        for _ in range(workers or Config.SCRAPE_WORKERS):
+            threading.Thread(target=self._serve, daemon=True).start()
+
+    def submit(self, location: str = "", industry: str = "", max_profiles: int = 20,
+               job_id: str = None, **options) -> int:
+        """
+        Queue a scrape (or the resumption of job_id) and return at once
+        options are passed to run_scraper: visible, use_cache, lean, archive_pages,
+        plus keep_browser to run on the shared warm browser.
+        Returns: task id to poll with tasks.get()
+        """
+        job = ScrapeJob.load(job_id) if job_id else None
+        if not job:
+            job = ScrapeJob.create(location, industry, max_profiles)
+        task_id = self.tasks.create(job.job_id, options)
+        self.tasks.update(task_id, progress_total=job.max_profiles, message="Waiting for a worker...")
+        self.queue.put(task_id)
+        return task_id
+
+    def _serve(self):
+        while True:
+            task_id = self.queue.get()
+            try:
+                self.run_task(task_id)
+            except Exception as e:
+                self.tasks.update(task_id, state='failed', success=0, result_message=f"Worker error: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    def run_task(self, task_id: int):
+        """Run one task to completion, reporting progress through the task table"""
+        task = self.tasks.get(task_id)
+        params = task['params']
+        self.tasks.update(task_id, state='running', captcha_solved=0)
+
+        def progress(current, total, message):
+            self.tasks.update(task_id, progress_current=current, progress_total=total, message=message)
+
+        run_stats = {}
+        success, message, _ = run_scraper(
+            email=Config.LINKEDIN_EMAIL,
+            password=Config.LINKEDIN_PASSWORD,
+            progress_callback=progress,
+            visible=params.get('visible', True),
+            use_cache=params.get('use_cache', True),
+            job_id=task['job_id'],
+            browser_session=self.browser_session if params.get('keep_browser') else None,
+            lean=params.get('lean'),
+            run_stats=run_stats,
+            archive_pages=params.get('archive_pages'),
+            captcha_handler=lambda: self.wait_for_captcha(task_id)
+        )
+        self.tasks.update(task_id, state='done' if success else 'failed', success=int(success),
+                          result_message=message, run_stats=json.dumps(run_stats))
+
+    def wait_for_captcha(self, task_id: int) -> bool:
+        """
+        Block the worker until the page confirms the CAPTCHA was solved
+        Returns: False if nobody confirmed within Config.CAPTCHA_WAIT_MINUTES
+        """
+        self.tasks.update(task_id, state='captcha',
+                          message="CAPTCHA detected - solve it in the browser window, then confirm on the page")
+        deadline = time.time() + Config.CAPTCHA_WAIT_MINUTES * 60
+        while time.time() < deadline:
+            if self.tasks.take_captcha_confirmation(task_id):
+                self.tasks.update(task_id, state='running', message="Checking login after CAPTCHA...")
+                return True
+            time.sleep(Config.TASK_POLL_SECONDS)
+        return False
@@ -3,30 +3,89 @@ LinkedIn Profile Scraper - Selenium Version
 WARNING: This script is for educational purposes only.
 Using automated scraping violates LinkedIn's Terms of Service and may result in account suspension.
 """
+import json
 import random
 import time
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional, Tuple
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
 import pandas as pd
 from config import Config
+from extractor import extract_profile, extract_profile_links, add_profile_urls, normalize_profile_url
+from profile_cache import ProfileCache
+from profile_writer import ProfileWriter
+from scrape_job import ScrapeJob
+from pacing import PacingScheduler
+from search_filters import build_search_url, snippet_terms, matches_snippet
+from selector_stats import SelectorRegistry
+from page_archive import PageArchive
+from profile_store import ProfileStore
+from run_trace import RunTrace
+from postprocess import postprocess_profiles, postprocess_run
+
+# CDP event carrying the bytes received over the network for one finished request
+# (encodedDataLength: headers plus compressed body, cross-origin requests included)
+NETWORK_BYTES_EVENT = 'Network.loadingFinished'
+
+# URL patterns blocked in lean mode: images, fonts and audio/video
+LEAN_BLOCKED_URLS = [
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    "*media.licdn.com/dms/image/*", "*dms.licdn.com/playlist/*",
+]
+
+# Current document height, used to detect when lazy-loaded content stops arriving
+PAGE_HEIGHT_SCRIPT = "return document.body.scrollHeight;"
+
+# Elements that signal the search results have rendered
+SEARCH_RESULT_SELECTOR = 'li.reusable-search__result-container, div.entity-result, a[href*="/in/"]'
+
+# Returns [resolved href, result card text] for every anchor that may point at a member profile
+HARVEST_LINKS_SCRIPT = """
+return Array.from(document.querySelectorAll('a[href*="/in/"]'), a => {
+    const card = a.closest('li');
+    return [a.href, card ? card.innerText : ''];
+});
+"""
+
+
+class page_height_settled:
+    """Wait condition: true once the document height is unchanged between two polls"""
+    
+    def __init__(self):
+        self.last_height = None
+        
+    def __call__(self, driver):
+        height = driver.execute_script(PAGE_HEIGHT_SCRIPT)
+        settled = height == self.last_height
+        self.last_height = height
+        return settled
 
 
 class LinkedInScraper:
     """LinkedIn profile scraper using Selenium with visible browser"""
     
-    def __init__(self, visible: bool = True):
+    def __init__(self, visible: bool = True, user_data_dir: Optional[str] = None, lean: bool = None):
         self.driver: Optional[webdriver.Chrome] = None
         self.wait: Optional[WebDriverWait] = None
         self.is_logged_in = False
         self.visible = visible
+        self.user_data_dir = user_data_dir
+        self.lean = Config.LEAN_PAGE_LOAD if lean is None else lean
+        self.pacer = PacingScheduler()
+        self.selectors = SelectorRegistry()
+        self.archive: Optional[PageArchive] = None
+        self.poll_seconds = Config.WAIT_POLL_SECONDS
+        self.trace = RunTrace()
+        self.reset_page_stats()
         
     def initialize(self):
         """Initialize Selenium WebDriver with Chrome"""
@@ -42,6 +101,23 @@ class LinkedInScraper:
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
         
+        # Persist cookies and local storage so a restarted browser stays logged in
+        if self.user_data_dir:
+            chrome_options.add_argument(f'--user-data-dir={self.user_data_dir}')
+        
+        # Lean mode: skip images/media and return from driver.get once the DOM is ready
+        if self.lean:
+            chrome_options.page_load_strategy = 'eager'
+            chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+            chrome_options.add_experimental_option('prefs', {
+                'profile.managed_default_content_settings.images': 2,
+                'profile.default_content_setting_values.autoplay': 2,
+            })
+        
+        # Log CDP network events, read back as the bytes transferred per run (see collect_network_bytes)
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        chrome_options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+        
         # Set realistic window size
         chrome_options.add_argument('--window-size=1920,1080')
         
@@ -51,10 +127,12 @@ class LinkedInScraper:
         # Initialize driver with automatic ChromeDriver management
         service = Service(ChromeDriverManager().install())
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        self.instrument_driver()
         
-        # Set implicit wait
-        self.driver.implicitly_wait(10)
-        self.wait = WebDriverWait(self.driver, 20)
+        # Readiness is handled by explicit waits (see wait_for); an implicit wait
+        # would make every failed lookup and wait poll block for its full duration
+        self.driver.implicitly_wait(0)
+        self.wait = WebDriverWait(self.driver, Config.PAGE_LOAD_TIMEOUT)
         
         # Execute CDP commands to prevent detection
         self.driver.execute_cdp_cmd('Network.setUserAgentOverride', {
@@ -62,6 +140,84 @@ class LinkedInScraper:
         })
         self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         
+        # Block fonts and media at the network layer (prefs only cover images)
+        if self.lean:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {"urls": LEAN_BLOCKED_URLS})
+        
+    def instrument_driver(self):
+        """Count every WebDriver command (one HTTP round-trip each) in the current run trace"""
+        execute = self.driver.execute
+        
+        def traced_execute(*args, **kwargs):
+            self.trace.count('webdriver_round_trips')
+            return execute(*args, **kwargs)
+        
+        self.driver.execute = traced_execute
+        
+    def reset_page_stats(self):
+        """Reset per-run page load statistics"""
+        self.page_stats = {'pages': 0, 'bytes': 0, 'load_seconds': 0.0}
+        if self.driver:
+            # Drop traffic logged before this run (e.g. while a warm browser sat idle);
+            # a dead driver must not stop the run from reaching release()
+            try:
+                self.read_network_bytes()
+            except Exception as e:
+                print(f"Could not read network log: {e}")
+        
+    def read_network_bytes(self) -> int:
+        """
+        Drain the browser's performance log
+        Returns: bytes received by requests that finished since the last read
+        """
+        total = 0
+        for entry in self.driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            if message.get('method') == NETWORK_BYTES_EVENT:
+                total += int(message['params'].get('encodedDataLength') or 0)
+        return total
+        
+    def collect_network_bytes(self):
+        """
+        Add the bytes of every request finished so far to the page stats
+        Requests still running when a page is read (lazy content after DOMContentLoaded
+        in eager mode) are counted by the next call, so nothing loaded is missed.
+        """
+        try:
+            with self.trace.span('page_metrics'):
+                self.page_stats['bytes'] += self.read_network_bytes()
+        except Exception as e:
+            print(f"Could not read network log: {e}")
+        
+    def navigate(self, url: str):
+        """
+        Load a page and record its load time and bytes transferred
+        The pacing scheduler spaces navigations by Config.MIN_DELAY/MAX_DELAY.
+        """
+        with self.trace.span('pacing_delay'):
+            self.pacer.wait()
+        start = time.perf_counter()
+        with self.trace.span('page_load'):
+            self.driver.get(url)
+        self.page_stats['load_seconds'] += time.perf_counter() - start
+        self.page_stats['pages'] += 1
+        self.collect_network_bytes()
+        
+    def wait_for(self, condition, timeout: float = None) -> bool:
+        """
+        Wait until an expected condition holds
+        Returns: True if it did, False on timeout
+        """
+        try:
+            with self.trace.span('page_wait'):
+                WebDriverWait(self.driver, timeout or Config.PAGE_LOAD_TIMEOUT,
+                              poll_frequency=self.poll_seconds).until(condition)
+            return True
+        except TimeoutException:
+            self.trace.count('wait_timeouts')
+            return False
+        
     def random_delay(self, min_delay=None, max_delay=None):
         """Add random delay to mimic human behavior"""
         min_delay = min_delay or Config.MIN_DELAY
@@ -81,13 +237,12 @@ class LinkedInScraper:
         Returns: (success: bool, message: str)
         """
         try:
-            self.driver.get(Config.LINKEDIN_LOGIN_URL)
-            self.random_delay(2, 3)
+            self.navigate(Config.LINKEDIN_LOGIN_URL)
             
             # Find and fill email
-            email_field = self.wait.until(
-                EC.presence_of_element_located((By.ID, "username"))
-            )
+            if not self.wait_for(EC.presence_of_element_located((By.ID, "username"))):
+                return False, "Login failed - login page did not load"
+            email_field = self.driver.find_element(By.ID, "username")
             self.human_like_typing(email_field, email)
             self.random_delay(0.5, 1.0)
             
@@ -100,8 +255,13 @@ class LinkedInScraper:
             sign_in_button = self.driver.find_element(By.CSS_SELECTOR, 'button[type="submit"]')
             sign_in_button.click()
             
-            # Wait for navigation
-            self.random_delay(4, 6)
+            # Wait for navigation away from the form, or for an error message
+            self.wait_for(EC.any_of(
+                EC.url_contains('/feed'),
+                EC.url_contains('/mynetwork'),
+                EC.url_contains('/checkpoint'),
+                EC.presence_of_element_located((By.CSS_SELECTOR, '.form__label--error'))
+            ))
             
             # Check if login was successful
             current_url = self.driver.current_url
@@ -131,6 +291,19 @@ class LinkedInScraper:
         except Exception as e:
             return False, f"Login error: {str(e)}"
             
+    def check_logged_in(self) -> bool:
+        """
+        Detect an existing LinkedIn session (e.g. restored from a persisted Chrome profile)
+        so the login form can be skipped
+        """
+        try:
+            self.navigate(Config.LINKEDIN_FEED_URL)
+            self.is_logged_in = '/feed' in self.driver.current_url
+        except Exception as e:
+            print(f"Session check failed: {e}")
+            self.is_logged_in = False
+        return self.is_logged_in
+            
     def search_profiles(self, location: str = "", industry: str = "", max_profiles: int = 20) -> List[str]:
         """
         Search for LinkedIn profiles and return profile URLs
@@ -139,106 +312,53 @@ class LinkedInScraper:
         if not self.is_logged_in:
             return []
             
-        profile_urls = []
+        profile_urls: List[str] = []
+        seen = set()
+        
+        # Filters LinkedIn cannot facet on are checked against each result card
+        terms = snippet_terms(location, industry)
+        
+        def keep(links) -> List[str]:
+            """Hrefs whose result card mentions every unfaceted filter term"""
+            return [href for href, snippet in links if not terms or matches_snippet(snippet, terms)]
         
         try:
-            # Navigate to people search
-            search_url = Config.LINKEDIN_SEARCH_URL
-            self.driver.get(search_url)
-            self.random_delay(3, 5)
+            # Navigate to people search with the filters applied as query parameters
+            search_url = build_search_url(location, industry)
+            print(f"Searching: {search_url}")
+            self.navigate(search_url)
             
-            # Scroll to load more profiles
+            # Wait for search results to render
+            if not self.wait_for(EC.presence_of_element_located((By.CSS_SELECTOR, SEARCH_RESULT_SELECTOR))):
+                print("Search results did not appear before timeout")
+            
+            # Scroll to load more profiles, waiting for lazy-loaded results to settle
             scroll_count = min(3, (max_profiles // 10) + 1)
             for i in range(scroll_count):
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                self.random_delay(2, 3)
+                with self.trace.span('scroll'):
+                    self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                self.wait_for(page_height_settled(), Config.SECTION_WAIT_TIMEOUT)
                 print(f"Scrolled {i+1}/{scroll_count} times")
             
-            # Wait for search results to load
-            self.random_delay(2, 3)
-            
-            # Method 1: Try finding profile links using Selenium (most reliable)
+            # Collect every candidate href in one in-browser call
             try:
-                # Find all links that contain '/in/' in href
-                link_elements = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/in/')]")
-                print(f"Found {len(link_elements)} potential profile links using Selenium")
-                
-                for idx, link_elem in enumerate(link_elements):
-                    try:
-                        href = link_elem.get_attribute('href')
-                        
-                        if href and '/in/' in href:
-                            # Clean the URL FIRST (remove query params and fragments)
-                            profile_url = href.split('?')[0].split('#')[0]
-                            
-                            # Check if cleaned URL contains miniProfile in the PATH (not query params)
-                            # Also check it's a valid /in/ URL
-                            if 'miniProfile' not in profile_url and '/in/' in profile_url:
-                                # Make sure it's a unique profile URL
-                                if profile_url not in profile_urls:
-                                    profile_urls.append(profile_url)
-                                    print(f"✓ Added profile {len(profile_urls)}: {profile_url}")
-                                    
-                                    if len(profile_urls) >= max_profiles:
-                                        break
-                    except Exception as e:
-                        print(f"Error processing link {idx+1}: {e}")
-                        continue
-                        
+                with self.trace.span('link_harvest'):
+                    links = self.driver.execute_script(HARVEST_LINKS_SCRIPT) or []
+                hrefs = keep(links)
+                print(f"Found {len(links)} potential profile links, {len(hrefs)} match the filters")
+                add_profile_urls(hrefs, profile_urls, seen, max_profiles)
             except Exception as e:
-                print(f"Method 1 failed: {e}")
-            
-            # Method 2: Try finding by specific search result container class
-            if len(profile_urls) < max_profiles:
-                try:
-                    # LinkedIn often uses these classes for search results
-                    search_containers = self.driver.find_elements(By.CSS_SELECTOR, 
-                        'li.reusable-search__result-container, div.search-result, div.entity-result')
-                    print(f"Found {len(search_containers)} search result containers")
-                    
-                    for container in search_containers:
-                        try:
-                            # Try to find profile link within container
-                            link = container.find_element(By.CSS_SELECTOR, 'a[href*="/in/"]')
-                            href = link.get_attribute('href')
-                            if href:
-                                profile_url = href.split('?')[0]
-                                if profile_url not in profile_urls and '/in/' in profile_url:
-                                    profile_urls.append(profile_url)
-                                    print(f"Added profile from container: {profile_url}")
-                                    
-                                if len(profile_urls) >= max_profiles:
-                                    break
-                        except:
-                            continue
-                except Exception as e:
-                    print(f"Method 2 failed: {e}")
+                print(f"Link harvest failed: {e}")
             
-            # Method 3: Fallback to BeautifulSoup with updated patterns
+            # Fallback: parse the page snapshot locally if the first pass came up short
             if len(profile_urls) < max_profiles:
                 try:
-                    soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                    links = soup.find_all('a', href=True)
-                    print(f"BeautifulSoup found {len(links)} total links")
-                    
-                    for link in links:
-                        href = link.get('href', '')
-                        if '/in/' in href and 'miniProfileUrn' not in href and 'miniProfile' not in href:
-                            # Clean up the URL
-                            if href.startswith('/'):
-                                profile_url = f"https://www.linkedin.com{href}"
-                            else:
-                                profile_url = href
-                            
-                            profile_url = profile_url.split('?')[0]
-                            
-                            if profile_url not in profile_urls and profile_url.startswith('https://www.linkedin.com/in/'):
-                                profile_urls.append(profile_url)
-                                
-                            if len(profile_urls) >= max_profiles:
-                                break
+                    with self.trace.span('link_harvest'):
+                        hrefs = keep(extract_profile_links(self.driver.page_source))
+                    added = add_profile_urls(hrefs, profile_urls, seen, max_profiles)
+                    print(f"Page source fallback added {added} profiles")
                 except Exception as e:
-                    print(f"Method 3 failed: {e}")
+                    print(f"Page source fallback failed: {e}")
             
             print(f"Total unique profiles found: {len(profile_urls)}")
             return profile_urls[:max_profiles]
@@ -253,98 +373,31 @@ class LinkedInScraper:
         Returns: Dictionary with profile data (Name, Headline, Location, Current Company, Current Position)
         """
         try:
-            self.driver.get(profile_url)
-            self.random_delay(2, 4)
+            self.navigate(profile_url)
             
-            # Scroll to load content
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight / 3);")
-            self.random_delay(1, 2)
-            
-            profile_data = {
-                'name': '',
-                'headline': '',
-                'location': '',
-                'current_company': '',
-                'current_position': ''
-            }
-            
-            # Extract name - try multiple selectors
-            try:
-                # Method 1: Primary selector
-                name_elem = self.driver.find_element(By.CSS_SELECTOR, 'h1.text-heading-xlarge')
-                profile_data['name'] = name_elem.text.strip()
-            except:
-                try:
-                    # Method 2: Alternative class
-                    name_elem = self.driver.find_element(By.XPATH, "//h1[contains(@class, 'inline')]")
-                    profile_data['name'] = name_elem.text.strip()
-                except:
-                    try:
-                        # Method 3: Find any h1 in profile section
-                        name_elem = self.driver.find_element(By.XPATH, "//main//h1")
-                        profile_data['name'] = name_elem.text.strip()
-                    except:
-                        print(f"Could not extract name from {profile_url}")
+            # Wait for the top card (name heading) to render
+            if not self.wait_for(EC.presence_of_element_located((By.CSS_SELECTOR, 'main h1'))):
+                print(f"Profile header did not appear before timeout: {profile_url}")
             
-            # Extract headline - try multiple methods
-            try:
-                # Method 1: div with text-body-medium
-                headline_elem = self.driver.find_element(By.CSS_SELECTOR, 'div.text-body-medium.break-words')
-                profile_data['headline'] = headline_elem.text.strip()
-            except:
-                try:
-                    # Method 2: Look for div under profile section
-                    headline_elem = self.driver.find_element(By.XPATH, "//main//div[contains(@class, 'text-body-medium')]")
-                    profile_data['headline'] = headline_elem.text.strip()
-                except:
-                    print(f"Could not extract headline from {profile_url}")
+            # Scroll to load content; the experience section is lazy-loaded
+            with self.trace.span('scroll'):
+                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight / 3);")
+            self.wait_for(EC.presence_of_element_located((By.ID, 'experience')), Config.SECTION_WAIT_TIMEOUT)
             
-            # Extract location
-            try:
-                # Method 1: Span with location info
-                location_elem = self.driver.find_element(By.CSS_SELECTOR, 'span.text-body-small.inline.t-black--light.break-words')
-                profile_data['location'] = location_elem.text.strip()
-            except:
-                try:
-                    # Method 2: Look for location in profile section
-                    location_elem = self.driver.find_element(By.XPATH, "//main//span[contains(@class, 'text-body-small')]")
-                    profile_data['location'] = location_elem.text.strip()
-                except:
-                    print(f"Could not extract location from {profile_url}")
+            # Take a single snapshot of the page and parse every field locally
+            with self.trace.span('page_source'):
+                page_source = self.driver.page_source
+            if self.archive:
+                with self.trace.span('archive'):
+                    self.archive.store(profile_url, page_source)
+            with self.trace.span('extraction'):
+                profile_data = extract_profile(page_source, self.selectors)
+            profile_data['profile_url'] = normalize_profile_url(profile_url) or profile_url
             
-            # Extract current position and company from headline
-            # LinkedIn often formats headline as "Position at Company"
-            headline = profile_data['headline']
-            if headline:
-                if ' at ' in headline or ' @ ' in headline:
-                    # Split by @ or at
-                    parts = headline.replace(' @ ', ' at ').split(' at ')
-                    if len(parts) >= 2:
-                        profile_data['current_position'] = parts[0].strip()
-                        profile_data['current_company'] = parts[1].strip()
-                else:
-                    # If no clear separator, try to get from experience section
-                    try:
-                        # Look for experience section
-                        exp_section = self.driver.find_element(By.ID, 'experience')
-                        # Get first position
-                        first_position = exp_section.find_element(By.CSS_SELECTOR, 'li.artdeco-list__item')
-                        
-                        # Try to get position title
-                        try:
-                            title_elem = first_position.find_element(By.CSS_SELECTOR, 'div[class*="display-flex"] span[aria-hidden="true"]')
-                            profile_data['current_position'] = title_elem.text.strip()
-                        except:
-                            pass
-                        
-                        # Try to get company name
-                        try:
-                            company_elem = first_position.find_element(By.CSS_SELECTOR, 'span.t-14.t-normal span[aria-hidden="true"]')
-                            profile_data['current_company'] = company_elem.text.strip()
-                        except:
-                            pass
-                    except:
-                        pass
+            for field in ('name', 'headline', 'location'):
+                if not profile_data[field]:
+                    self.trace.count(f'empty_{field}')
+                    print(f"Could not extract {field} from {profile_url}")
             
             print(f"Scraped: {profile_data['name']} | {profile_data['headline'][:50] if profile_data['headline'] else 'No headline'}")
             return profile_data
@@ -353,33 +406,65 @@ class LinkedInScraper:
             print(f"Error scraping profile {profile_url}: {str(e)}")
             return None
             
-    def scrape_profiles(self, profile_urls: List[str], progress_callback=None) -> List[Dict]:
+    def iter_profiles(self, profile_urls: List[str], progress_callback=None,
+                      cache: Optional[ProfileCache] = None) -> Iterator[Tuple[str, Dict]]:
         """
-        Scrape multiple profiles with progress tracking
+        Scrape profiles one at a time, yielding (profile_url, profile_data) as each completes
+        Fresh cache hits are served without loading the page; misses are fetched and cached.
+        Profiles that fail to scrape are yielded with profile_data set to None.
         """
-        profiles_data = []
         total = len(profile_urls)
         
-        for idx, url in enumerate(profile_urls, 1):
-            if progress_callback:
-                progress_callback(idx, total, f"Scraping profile {idx}/{total}")
-            
-            profile_data = self.scrape_profile(url)
-            if profile_data:
-                profiles_data.append(profile_data)
-            
-            # Add delay between profiles to avoid detection
-            if idx < total:
-                self.random_delay()
-        
-        return profiles_data
+        try:
+            for idx, url in enumerate(profile_urls, 1):
+                profile_data = cache.get(url) if cache else None
+                
+                if progress_callback:
+                    message = f"Scraping profile {idx}/{total}"
+                    if cache:
+                        message += f" (cache: {cache.hits} hits, {cache.misses} misses)"
+                    progress_callback(idx, total, message)
+                
+                if profile_data:
+                    self.trace.count('cache_hits')
+                    yield url, profile_data
+                    continue
+                
+                # Pacing between fetches is enforced by navigate()
+                round_trips = self.trace.counters.get('webdriver_round_trips', 0)
+                selector_misses = self.selectors.miss_count
+                start = time.perf_counter()
+                with self.trace.span('profile'):
+                    profile_data = self.scrape_profile(url)
+                self.trace.count('selector_misses', self.selectors.miss_count - selector_misses)
+                self.trace.add_profile(url, time.perf_counter() - start,
+                                       self.trace.counters.get('webdriver_round_trips', 0) - round_trips,
+                                       self.selectors.miss_count - selector_misses)
+                if profile_data and cache:
+                    cache.put(url, profile_data)
+                yield url, profile_data
+        finally:
+            if cache:
+                cache.save()
+            self.selectors.save()
+    
+    def scrape_profiles(self, profile_urls: List[str], progress_callback=None,
+                        cache: Optional[ProfileCache] = None) -> List[Dict]:
+        """
+        Scrape multiple profiles with progress tracking
+        """
+        return [profile_data for _, profile_data in self.iter_profiles(profile_urls, progress_callback, cache)
+                if profile_data]
     
-    def save_to_csv(self, profiles_data: List[Dict], filename: str = None):
-        """Save scraped profiles to CSV file"""
+    def save_to_csv(self, profiles_data: List[Dict], filename: str = None, store: ProfileStore = None):
+        """Save scraped profiles to the profile store and a CSV file"""
         if not filename:
             filename = Config.get_output_path()
         
-        df = pd.DataFrame(profiles_data)
+        df = postprocess_profiles(pd.DataFrame(profiles_data))
+        store = store or ProfileStore()
+        store.upsert_profiles([(p['profile_url'], p) for p in df.to_dict('records') if p.get('profile_url')])
+        
         df.to_csv(filename, index=False, encoding='utf-8')
         return filename
     
@@ -394,32 +479,107 @@ class LinkedInScraper:
 
 def run_scraper(email: str, password: str, location: str = "", 
                 industry: str = "", max_profiles: int = 20, 
-                progress_callback=None, visible: bool = True) -> tuple[bool, str, List[Dict]]:
+                progress_callback=None, visible: bool = True,
+                use_cache: bool = True, job_id: str = None,
+                browser_session=None, lean: bool = None,
+                run_stats: Dict = None, archive_pages: bool = None,
+                captcha_handler=None) -> tuple[bool, str, List[Dict]]:
     """
     Main function to run the scraper
+    Pass job_id to resume an interrupted job: its saved filters and URL frontier
+    are reused, the search phase is skipped and only unscraped profiles are fetched.
+    Pass a BrowserSession to reuse a warm, logged-in browser instead of starting
+    (and later quitting) a new one.
+    Pass a dict as run_stats to receive page load statistics for the run
+    (pages, bytes, load_seconds).
+    With archive_pages (default Config.ARCHIVE_PAGES), every fetched profile page is
+    kept in the raw page archive for offline re-extraction.
+    captcha_handler is called when login hits a CAPTCHA; it should block until the
+    user has solved it in the browser and return False to give up. Without one,
+    the scraper waits for Enter on the terminal.
+    Per-phase timings and counters are written as a JSON run report next to the
+    output CSV; run_stats also receives it under 'report'.
     Returns: (success: bool, message: str, profiles_data: List[Dict])
     """
-    scraper = LinkedInScraper(visible=visible)
+    if job_id:
+        job = ScrapeJob.load(job_id)
+        if not job:
+            return False, f"Job {job_id} not found", []
+        location, industry, max_profiles = job.location, job.industry, job.max_profiles
+    else:
+        job = ScrapeJob.create(location, industry, max_profiles)
+    
     profiles_data = []
+    trace = RunTrace()
+    
+    if progress_callback:
+        progress_callback(0, max_profiles, f"{'Resuming' if job.has_frontier else 'Starting'} job {job.job_id}...")
+    
+    # Initialize browser (or take the warm one from the session)
+    if progress_callback:
+        progress_callback(0, max_profiles, "Initializing browser...")
+    if browser_session:
+        try:
+            with trace.span('browser_start'):
+                scraper = browser_session.acquire(visible, lean)
+        except Exception as e:
+            return False, f"Error starting browser: {str(e)}", []
+    else:
+        scraper = LinkedInScraper(visible=visible, lean=lean)
+    scraper.trace = trace
+    scraper.reset_page_stats()
+    archive_pages = Config.ARCHIVE_PAGES if archive_pages is None else archive_pages
+    scraper.archive = PageArchive() if archive_pages else None
+    
+    def release():
+        """Write the run report, then hand the browser back to the session or quit it if it is ours"""
+        if scraper.driver:
+            # Count what the last page kept loading after it was read
+            scraper.collect_network_bytes()
+        report = trace.report(job_id=job.job_id, profiles_completed=len(job.completed),
+                              page_stats=scraper.page_stats)
+        try:
+            report_path = trace.save(Config.get_run_report_path(), report)
+            print(f"Run report saved to {report_path}")
+        except OSError as e:
+            print(f"Could not save run report: {e}")
+        if run_stats is not None:
+            run_stats.update(scraper.page_stats)
+            run_stats['report'] = report
+        if browser_session:
+            browser_session.release()
+        else:
+            scraper.close()
     
     try:
-        # Initialize browser
-        if progress_callback:
-            progress_callback(0, max_profiles, "Initializing browser...")
-        scraper.initialize()
+        if not scraper.driver:
+            with trace.span('browser_start'):
+                scraper.initialize()
         
-        # Login
-        if progress_callback:
-            progress_callback(0, max_profiles, "Logging in to LinkedIn...")
-        success, message = scraper.login(email, password)
+        # Login, unless the browser already holds (or restored) a LinkedIn session
+        success, message = True, "Reusing existing LinkedIn session"
+        with trace.span('login'):
+            restored = scraper.is_logged_in or (scraper.user_data_dir and scraper.check_logged_in())
+            if not restored:
+                if progress_callback:
+                    progress_callback(0, max_profiles, "Logging in to LinkedIn...")
+                success, message = scraper.login(email, password)
         
         if not success:
             # Keep browser open if login failed so user can see/solve CAPTCHA
             if 'CAPTCHA' in message or 'challenge' in message:
                 if progress_callback:
                     progress_callback(0, max_profiles, "Waiting for manual CAPTCHA solve...")
-                # Wait for user to solve CAPTCHA and press Enter in terminal
-                input("\n⚠️  Please solve the CAPTCHA in the browser window, then press Enter here to continue...")
+                # Wait for the user to solve the CAPTCHA (UI handler, or Enter in the terminal)
+                with trace.span('captcha_wait'):
+                    if captcha_handler:
+                        solved = captcha_handler()
+                    else:
+                        input("\n⚠️  Please solve the CAPTCHA in the browser window, then press Enter here to continue...")
+                        solved = True
+                if not solved:
+                    release()
+                    return False, "Gave up waiting for the CAPTCHA to be solved", []
                 
                 # Check if login succeeded after CAPTCHA solve
                 current_url = scraper.driver.current_url
@@ -428,36 +588,72 @@ def run_scraper(email: str, password: str, location: str = "",
                     success = True
                     message = "Login successful after CAPTCHA solve"
                 else:
-                    scraper.close()
+                    release()
                     return False, "Login still failed after CAPTCHA attempt", []
             else:
-                scraper.close()
+                release()
                 return False, message, []
         
-        # Search for profiles
-        if progress_callback:
-            progress_callback(0, max_profiles, "Searching for profiles...")
-        profile_urls = scraper.search_profiles(location, industry, max_profiles)
+        # Search for profiles, unless this job already has a checkpointed frontier
+        if not job.has_frontier:
+            if progress_callback:
+                progress_callback(0, max_profiles, "Searching for profiles...")
+            with trace.span('search'):
+                job.set_frontier(scraper.search_profiles(location, industry, max_profiles))
         
-        if not profile_urls:
-            scraper.close()
+        if not job.frontier:
+            release()
+            job.finish()
             return False, "No profiles found with the given filters", []
         
-        # Scrape profiles
-        profiles_data = scraper.scrape_profiles(profile_urls, progress_callback)
+        # Scrape profiles, serving recently fetched ones from the cache and
+        # appending each record to the output journal as soon as it is ready
+        cache = ProfileCache() if use_cache else None
+        store = ProfileStore()
+        run_id = store.start_run(job.job_id, location, industry)
+        scraped = []
+        with ProfileWriter() as writer:
+            try:
+                for profile_url, profile_data in scraper.iter_profiles(job.pending(), progress_callback, cache):
+                    with trace.span('persist'):
+                        if profile_data:
+                            writer.write(profile_url, profile_data)
+                            store.upsert_profile(profile_url, profile_data, run_id)
+                            scraped.append((profile_url, profile_data))
+                            job.mark_completed(profile_url)
+                        else:
+                            job.mark_failed(profile_url)
+            finally:
+                # Cleanup (headline split, company/location normalization) of the
+                # records stored so far, in one vectorized pass
+                with trace.span('postprocess'):
+                    postprocess_run(scraped, store)
+        job.finish()
+        store.finish_run(run_id, len(job.completed))
+        
+        if cache:
+            print(f"Profile cache: {cache.hits} hits, {cache.misses} misses")
         
-        if not profiles_data:
-            scraper.close()
-            return False, "Failed to scrape any profile data", []
+        stale = scraper.selectors.stale_selectors()
+        for field, selector in stale:
+            print(f"⚠️  Selector for {field} has stopped matching: {selector}")
+        
+        if not job.completed:
+            release()
+            return False, f"Failed to scrape any profile data (job {job.job_id})", []
         
-        # Save to CSV
+        # Compact the journal into the final deduplicated CSV
         if progress_callback:
-            progress_callback(len(profiles_data), max_profiles, "Saving data to CSV...")
-        filename = scraper.save_to_csv(profiles_data)
+            progress_callback(len(job.completed), max_profiles, "Saving data to CSV...")
+        with trace.span('save'):
+            filename = writer.compact()
+        profiles_data = store.get_profiles(job.completed)
         
-        scraper.close()
-        return True, f"Successfully scraped {len(profiles_data)} profiles. Data saved to {filename}", profiles_data
+        release()
+        cache_note = f" ({cache.hits} served from cache)" if cache and cache.hits else ""
+        stale_note = f" Warning: {len(stale)} selector(s) have stopped matching, see console." if stale else ""
+        return True, f"Successfully scraped {len(profiles_data)} profiles{cache_note}. Data saved to {filename}.{stale_note}", profiles_data
         
     except Exception as e:
-        scraper.close()
-        return False, f"Error during scraping: {str(e)}", profiles_data
+        release()
+        return False, f"Error during scraping: {str(e)}. Resume with job {job.job_id}", profiles_data
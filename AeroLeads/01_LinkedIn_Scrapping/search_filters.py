@@ -0,0 +1,45 @@
+"""
+Search filters - apply location and industry before any profile is opened
+Known locations and industries become LinkedIn people-search facets (geoUrn /
+industry). Anything without a facet id (custom values, industries LinkedIn has
+no code for) is sent as a keyword and also checked against the result card
+snippet, so non-matching profiles are dropped before their page is loaded.
+"""
+import json
+from typing import Dict, List
+from urllib.parse import urlencode
+from config import Config
+
+
+def snippet_terms(location: str = "", industry: str = "") -> List[str]:
+    """Filter values with no search facet, which must be matched against card text"""
+    terms = []
+    if location and location not in Config.LOCATION_GEO_URNS:
+        terms.append(location)
+    if industry and industry not in Config.INDUSTRY_IDS:
+        terms.append(industry)
+    return terms
+
+
+def build_search_url(location: str = "", industry: str = "") -> str:
+    """People search URL with the filters encoded as facets and keywords"""
+    params: Dict[str, str] = {}
+    if location in Config.LOCATION_GEO_URNS:
+        params['geoUrn'] = json.dumps([Config.LOCATION_GEO_URNS[location]])
+    if industry in Config.INDUSTRY_IDS:
+        params['industry'] = json.dumps([Config.INDUSTRY_IDS[industry]])
+
+    keywords = snippet_terms(location, industry)
+    if keywords:
+        params['keywords'] = ' '.join(keywords)
+
+    if not params:
+        return Config.LINKEDIN_SEARCH_URL
+    params['origin'] = 'FACETED_SEARCH'
+    return f"{Config.LINKEDIN_SEARCH_URL}?{urlencode(params)}"
+
+
+def matches_snippet(snippet: str, terms: List[str]) -> bool:
+    """Whether a result card mentions every unfaceted filter term (case-insensitive)"""
+    text = (snippet or '').lower()
+    return all(term.lower() in text for term in terms)
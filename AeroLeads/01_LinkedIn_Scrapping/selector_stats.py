@@ -0,0 +1,92 @@
+"""
+Adaptive selector registry - per-field selector hit rates
+Records which selector in each field's fallback chain actually matched, persists
+the counts between runs, and orders each chain so the historically best
+selector is tried first. Selectors that keep missing are reported as stale so
+they can be fixed before every profile pays for them. Every few extractions the
+whole chain is probed, so demoted selectors can recover (or be confirmed stale).
+"""
+import json
+import os
+from typing import Dict, List, Tuple
+from config import Config
+
+# Weight of the latest lookup in a selector's moving-average hit rate
+SCORE_DECAY = 0.3
+
+
+class SelectorRegistry:
+    """Hit/miss statistics per (field, selector), stored in data/selector_stats.json"""
+
+    def __init__(self, path: str = None, stale_after: int = None, probe_every: int = None):
+        self.path = path or Config.get_selector_stats_path()
+        self.stale_after = stale_after or Config.SELECTOR_STALE_AFTER
+        self.probe_every = probe_every or Config.SELECTOR_PROBE_EVERY
+        self.stats: Dict[str, Dict[str, Dict]] = {}
+        self.lookups: Dict[str, int] = {}
+        self.miss_count = 0  # Failed lookups since this registry was created
+        self.load()
+
+    def load(self):
+        """Load statistics from disk, starting empty if the file is missing or corrupt"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self.stats = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable selector stats {self.path}: {e}")
+            self.stats = {}
+
+    def save(self):
+        """Write statistics to disk atomically"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.stats, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def entry(self, field: str, selector: str) -> Dict:
+        return self.stats.setdefault(field, {}).setdefault(
+            selector, {'hits': 0, 'misses': 0, 'consecutive_misses': 0, 'score': 0.5})
+
+    def hit_rate(self, field: str, selector: str) -> float:
+        """
+        Recency-weighted hit rate (exponential moving average); selectors never tried score 0.5
+        Weighting recent lookups lets a long-reliable selector drop quickly once it breaks.
+        """
+        entry = self.stats.get(field, {}).get(selector)
+        if not entry:
+            return 0.5
+        return entry.get('score', 0.5)
+
+    def ordered(self, field: str, selectors: List[str]) -> List[str]:
+        """Selectors sorted by hit rate, keeping the declared order for ties"""
+        ranked = sorted(enumerate(selectors), key=lambda item: (-self.hit_rate(field, item[1]), item[0]))
+        return [selector for _, selector in ranked]
+
+    def should_probe(self, field: str) -> bool:
+        """Whether this extraction of the field should try every selector in the chain"""
+        count = self.lookups.get(field, 0)
+        self.lookups[field] = count + 1
+        return count % self.probe_every == 0
+
+    def record(self, field: str, selector: str, hit: bool):
+        """Count one lookup of a selector"""
+        entry = self.entry(field, selector)
+        entry['score'] = (1 - SCORE_DECAY) * entry.get('score', 0.5) + SCORE_DECAY * (1.0 if hit else 0.0)
+        if hit:
+            entry['hits'] += 1
+            entry['consecutive_misses'] = 0
+        else:
+            self.miss_count += 1
+            entry['misses'] += 1
+            entry['consecutive_misses'] += 1
+
+    def stale_selectors(self) -> List[Tuple[str, str]]:
+        """(field, selector) pairs that have missed stale_after times in a row"""
+        return [
+            (field, selector)
+            for field, selectors in self.stats.items()
+            for selector, entry in selectors.items()
+            if entry['consecutive_misses'] >= self.stale_after
+        ]
@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+from postprocess import postprocess_profiles, postprocess_run
+from profile_store import ProfileStore
+
+JANE = 'https://www.linkedin.com/in/jane'
+
+
+def profile(**fields):
+    return dict({'name': '', 'headline': '', 'location': '', 'current_company': '', 'current_position': ''},
+                **fields)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ProfileStore(str(tmp_path / 'profiles.db'))
+    yield store
+    store.close()
+
+
+def test_duplicates_are_merged_by_canonical_url_keeping_the_last():
+    df = pd.DataFrame([
+        profile(profile_url=f"{JANE}/", name='Jane'),
+        profile(profile_url='https://uk.linkedin.com/in/jane?trk=search', name='Jane Doe'),
+        profile(profile_url='https://www.linkedin.com/in/bob/details/experience/', name='Bob'),
+    ])
+
+    cleaned = postprocess_profiles(df).set_index('profile_url')
+
+    assert sorted(cleaned.index) == ['https://www.linkedin.com/in/bob', JANE]
+    assert cleaned.loc[JANE, 'name'] == 'Jane Doe'
+
+
+def test_time_column_keeps_the_most_recent_record():
+    df = pd.DataFrame([
+        profile(profile_url=JANE, name='Jane (new)', scraped_at='2026-02-01 09:00:00'),
+        profile(profile_url=JANE, name='Jane (old)', scraped_at='2026-01-01 09:00:00'),
+    ])
+
+    cleaned = postprocess_profiles(df, time_column='scraped_at')
+
+    assert cleaned['name'].tolist() == ['Jane (new)']
+
+
+def test_headline_company_and_location_are_cleaned():
+    df = pd.DataFrame([profile(
+        profile_url=JANE, name='  Jane \n Doe ', headline='Data Scientist @ Acme Corp',
+        location='Pune ,Maharashtra,  India ,', current_company='Initech · Full-time', current_position='Analyst')])
+
+    record = postprocess_profiles(df).iloc[0]
+
+    assert record['name'] == 'Jane Doe'
+    assert record['current_position'] == 'Data Scientist'
+    assert record['current_company'] == 'Acme Corp'
+    assert record['location'] == 'Pune, Maharashtra, India'
+
+
+def test_experience_values_are_kept_when_the_headline_names_no_company():
+    df = pd.DataFrame([profile(profile_url=JANE, headline='Building things',
+                               current_company='Initech | ex-Acme', current_position='Engineer')])
+
+    record = postprocess_profiles(df).iloc[0]
+
+    assert record['current_position'] == 'Engineer'
+    assert record['current_company'] == 'Initech'
+
+
+def test_postprocess_run_cleans_stored_records_without_logging_fetches(store):
+    run_id = store.start_run('job', 'Pune', '')
+    records = [(f"{JANE}/?trk=search", profile(name=' Jane ', headline='CTO at Acme · Full-time'))]
+    for profile_url, profile_data in records:
+        store.upsert_profile(profile_url, profile_data, run_id)
+
+    assert postprocess_run(records, store) == 1
+
+    [stored] = store.get_profiles([JANE])
+    assert (stored['name'], stored['current_position'], stored['current_company']) == ('Jane', 'CTO', 'Acme')
+    assert store.conn.execute("SELECT COUNT(*) FROM fetches").fetchone()[0] == 1
@@ -0,0 +1,93 @@
+import glob
+import pandas as pd
+import pytest
+from profile_writer import ProfileWriter, ROTATED_SUFFIX
+
+JANE = 'https://www.linkedin.com/in/jane'
+BOB = 'https://www.linkedin.com/in/bob'
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / 'journal.csv'), str(tmp_path / 'profiles.csv')
+
+
+def read_output(output_path):
+    return pd.read_csv(output_path, dtype=str, keep_default_na=False).set_index('profile_url')
+
+
+def test_compact_merges_journal_into_output_and_removes_it(paths):
+    journal_path, output_path = paths
+    with ProfileWriter(journal_path, output_path) as writer:
+        writer.write(JANE, {'name': 'Jane'})
+        writer.write(BOB, {'name': 'Bob'})
+        assert writer.compact() == output_path
+
+    assert sorted(read_output(output_path).index) == [BOB, JANE]
+    assert not glob.glob(f"{journal_path}*{ROTATED_SUFFIX}")
+
+
+def test_compact_keeps_earlier_runs_and_one_row_per_profile(paths):
+    journal_path, output_path = paths
+    with ProfileWriter(journal_path, output_path) as writer:
+        writer.write(JANE, {'name': 'Jane'}, scraped_at='2026-01-01 10:00:00')
+        writer.compact()
+    with ProfileWriter(journal_path, output_path) as writer:
+        writer.write(f"{JANE}/?trk=search", {'name': 'Jane Doe'}, scraped_at='2026-01-02 10:00:00')
+        writer.write(BOB, {'name': 'Bob'}, scraped_at='2026-01-02 10:00:00')
+        writer.compact()
+
+    output = read_output(output_path)
+    assert len(output) == 2
+    assert output.loc[JANE, 'name'] == 'Jane Doe'
+
+
+def test_writer_open_during_compaction_continues_in_a_new_journal(paths):
+    journal_path, output_path = paths
+    late = ProfileWriter(journal_path, output_path)
+    with ProfileWriter(journal_path, output_path) as writer:
+        writer.write(JANE, {'name': 'Jane'})
+        writer.compact()
+
+    late.write(BOB, {'name': 'Bob'})
+    late.compact()
+    late.close()
+
+    assert sorted(read_output(output_path).index) == [BOB, JANE]
+
+
+def test_compact_merges_journals_left_by_a_crashed_compaction(paths):
+    journal_path, output_path = paths
+    with ProfileWriter(journal_path, output_path) as writer:
+        writer.write(JANE, {'name': 'Jane'})
+        writer.rotate()  # crash before the rotated journal was merged
+        writer.write(BOB, {'name': 'Bob'})
+        writer.compact()
+
+    assert sorted(read_output(output_path).index) == [BOB, JANE]
+    assert not glob.glob(f"{journal_path}*{ROTATED_SUFFIX}")
+
+
+def test_compact_keeps_the_newest_scrape_over_a_later_written_older_one(paths):
+    journal_path, output_path = paths
+    with ProfileWriter(journal_path, output_path) as writer:
+        writer.write(JANE, {'name': 'Jane (rescraped)'}, scraped_at='2026-05-01 10:00:00')
+        writer.compact()
+    # Re-extraction journals an archived page with its original fetch time
+    with ProfileWriter(journal_path, output_path) as writer:
+        writer.write(JANE, {'name': 'Jane (archived)'}, scraped_at='2026-01-01 10:00:00')
+        writer.compact()
+
+    assert read_output(output_path).loc[JANE, 'name'] == 'Jane (rescraped)'
+
+
+def test_compact_prefers_the_journaled_record_on_equal_scrape_times(paths):
+    journal_path, output_path = paths
+    with ProfileWriter(journal_path, output_path) as writer:
+        writer.write(JANE, {'name': 'Jane  Doe '}, scraped_at='2026-01-01 10:00:00')
+        writer.compact()
+    with ProfileWriter(journal_path, output_path) as writer:
+        writer.write(JANE, {'name': 'Jane Re-extracted'}, scraped_at='2026-01-01 10:00:00')
+        writer.compact()
+
+    assert read_output(output_path).loc[JANE, 'name'] == 'Jane Re-extracted'
@@ -0,0 +1,52 @@
+import json
+import pytest
+from config import Config
+from scrape_job import ScrapeJob
+
+JANE = 'https://www.linkedin.com/in/jane'
+BOB = 'https://www.linkedin.com/in/bob'
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(Config, 'MAX_PROFILE_ATTEMPTS', 2)
+
+
+def test_failed_profiles_are_retried_until_they_run_out_of_attempts():
+    job = ScrapeJob.create()
+    job.set_frontier([JANE, BOB])
+    job.mark_completed(JANE)
+
+    job.mark_failed(BOB)
+    job.finish()
+    assert job.pending() == [BOB]
+    assert [unfinished.job_id for unfinished in ScrapeJob.list_unfinished()] == [job.job_id]
+
+    job.mark_failed(BOB)
+    job.finish()
+    assert job.pending() == []
+    assert job.status == 'completed'
+    assert ScrapeJob.list_unfinished() == []
+
+
+def test_a_retried_profile_that_succeeds_is_no_longer_failed():
+    job = ScrapeJob.create()
+    job.set_frontier([JANE])
+    job.mark_failed(JANE)
+    job.mark_completed(JANE)
+
+    assert ScrapeJob.load(job.job_id).failed == {}
+
+
+def test_checkpoints_listing_failed_urls_load_with_one_attempt_each():
+    job = ScrapeJob.create()
+    job.set_frontier([JANE, BOB])
+    checkpoint = dict(job.to_dict(), failed=[BOB])
+    with open(ScrapeJob.path_for(job.job_id), 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+
+    loaded = ScrapeJob.load(job.job_id)
+
+    assert loaded.failed == {BOB: 1}
+    assert loaded.pending() == [JANE, BOB]
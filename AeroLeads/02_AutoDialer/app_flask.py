@@ -1,15 +1,27 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, make_response
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, Response
 import os
+import io
+import csv
+import zlib
+import itertools
+import json
+import re
 from datetime import datetime
 import random
 import pandas as pd
-import requests
 from dotenv import load_dotenv
 import google.generativeai as genai
 from twilio.rest import Client
 from twilio.twiml.voice_response import VoiceResponse
+from twilio.request_validator import RequestValidator
 import threading
 import time
+from call_store import CallStore, SORT_COLUMNS, LOG_COLUMNS
+from dialer import BulkDialer, TokenBucket
+from message_cache import MessageCache, normalize_reason
+from webhook_queue import WebhookQueue
+from call_state import STATUS_RANK, open_call_state
+from recording_downloader import RecordingDownloader, is_allowed_url
 
 # Load environment variables from home directory
 load_dotenv(os.path.expanduser('~/.env'))
@@ -25,53 +37,181 @@ TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER')
 # Initialize Twilio client
 twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
 
+# Checks the X-Twilio-Signature header of webhook requests
+twilio_validator = RequestValidator(TWILIO_AUTH_TOKEN or '')
+
+# Public URL Twilio calls the webhooks on (e.g. the ngrok URL), when it differs from
+# the URL Flask sees behind a proxy; signatures are computed over the public URL
+TWILIO_WEBHOOK_BASE_URL = os.getenv('TWILIO_WEBHOOK_BASE_URL', '').rstrip('/')
+VALIDATE_TWILIO_SIGNATURE = os.getenv('VALIDATE_TWILIO_SIGNATURE', '1') != '0'
+
 # Flask app
 app = Flask(__name__)
 app.secret_key = 'auto_dialer_secret_key'
 
 # Constants
-LOGS_FILE = 'data/call_logs.csv'
+LOGS_FILE = 'data/call_logs.csv'  # Legacy CSV log, imported into CALLS_DB on first start
+CALLS_DB = 'data/calls.db'
+MESSAGE_CACHE_DB = 'data/message_cache.db'
+CALL_STATE_DB = 'data/call_state.db'
+CALL_STATE_BACKEND = os.getenv('CALL_STATE_BACKEND', 'sqlite')  # 'sqlite' (multi-process) or 'memory'
+MESSAGE_CACHE_TTL_HOURS = float(os.getenv('MESSAGE_CACHE_TTL_HOURS', 24 * 7))
+MESSAGE_CACHE_MAX_ENTRIES = int(os.getenv('MESSAGE_CACHE_MAX_ENTRIES', 10000))
+MESSAGE_BATCH_SIZE = int(os.getenv('MESSAGE_BATCH_SIZE', 25))  # Reasons per batched Gemini prompt
 RECORDINGS_DIR = 'recordings/'
+TWILIO_CPS = float(os.getenv('TWILIO_CPS', 1))  # Calls per second allowed on the Twilio account
+BULK_CALL_WORKERS = int(os.getenv('BULK_CALL_WORKERS', 4))  # Campaign rows dialed in parallel
+WEBHOOK_WORKERS = int(os.getenv('WEBHOOK_WORKERS', 2))  # Threads applying queued Twilio callbacks
+WEBHOOK_RETRY_SECONDS = float(os.getenv('WEBHOOK_RETRY_SECONDS', 120))  # Persisted callbacks not applied by then are retried
+WEBHOOK_SWEEP_SECONDS = 30  # How often persisted callbacks are checked for retries
+RECORDING_DOWNLOAD_WORKERS = int(os.getenv('RECORDING_DOWNLOAD_WORKERS', 3))  # Recordings downloaded at once
+CALL_SID_PATTERN = re.compile(r'^CA[0-9a-fA-F]{32}$')
 
 # Ensure directories exist
 os.makedirs('data', exist_ok=True)
 os.makedirs(RECORDINGS_DIR, exist_ok=True)
 
-# In-memory call status storage (in production, use database)
-call_statuses = {}
+# Call log database (single-row inserts and updates indexed by call_sid)
+call_store = CallStore(CALLS_DB, legacy_csv=LOGS_FILE)
 
-def generate_call_message(reason):
-    """Generate a natural call message using Gemini API"""
-    try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        prompt = f"""
-        Create a natural, professional phone message for an automated call with the following purpose: "{reason}".
+# Live call status, shared by every worker process behind the webhook URL
+call_state = open_call_state(CALL_STATE_BACKEND, CALL_STATE_DB)
+
+# Outbound calls from every process share one CPS budget; campaigns are dialed in the background
+call_rate_limiter = TokenBucket(call_state, 'twilio_calls', TWILIO_CPS)
+bulk_dialer = BulkDialer(call_store, workers=BULK_CALL_WORKERS)
+
+# Recordings are streamed to disk in the background over one pooled session;
+# a download is claimed in the shared call state so only one process fetches it
+recording_downloader = RecordingDownloader(RECORDINGS_DIR, auth=(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN),
+                                           workers=RECORDING_DOWNLOAD_WORKERS, claims=call_state)
 
-        The message should be:
+# Gemini model, created once and shared by every request
+gemini_model = genai.GenerativeModel('gemini-2.5-flash')
+
+# Bump when the prompt changes so cached messages from the old prompt are not reused
+MESSAGE_PROMPT_VERSION = '1'
+
+# Generated messages, memoized per normalized reason
+message_cache = MessageCache(MESSAGE_CACHE_DB, MESSAGE_PROMPT_VERSION,
+                             ttl_seconds=MESSAGE_CACHE_TTL_HOURS * 3600,
+                             max_entries=MESSAGE_CACHE_MAX_ENTRIES)
+
+# Requirements shared by the single and batched message prompts
+MESSAGE_GUIDELINES = """
         - Concise (20-30 seconds when spoken)
         - Professional and polite
         - Include a call-to-action
         - Sound like a human caller
         - End with contact information request
         - on behalf of Darshil's Company
+"""
+
+def request_call_message(reason):
+    """Ask Gemini for a call message (raises on API errors, so failures are never cached)"""
+    prompt = f"""
+        Create a natural, professional phone message for an automated call with the following purpose: "{reason}".
 
+        The message should be:{MESSAGE_GUIDELINES}
         Generate only the spoken message, no additional text.
         """
 
-        response = model.generate_content(prompt)
-        return response.text.strip()
+    response = gemini_model.generate_content(prompt)
+    return response.text.strip()
+
+def parse_batch_id(value):
+    """Integer id of a batched reply entry; ids given as strings ("3") are accepted, None if invalid"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+def parse_message_batch(text, count):
+    """Messages by id from a batched reply (a JSON array of {"id", "message"}); invalid entries are skipped"""
+    start, end = text.find('['), text.rfind(']')
+    if start == -1 or end < start:
+        return {}
+    try:
+        items = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(items, list):
+        return {}
+
+    messages = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        item_id, message = parse_batch_id(item.get('id')), item.get('message')
+        if item_id is not None and 0 <= item_id < count and item_id not in messages \
+                and isinstance(message, str) and message.strip():
+            messages[item_id] = message.strip()
+    return messages
+
+def request_call_messages(reasons):
+    """
+    Generate messages for many reasons with one Gemini call per MESSAGE_BATCH_SIZE reasons
+    Entries missing from or invalid in a reply are generated one at a time.
+    Returns: dict of reason -> message (reasons that fail entirely are left out)
+    """
+    messages = {}
+    for start in range(0, len(reasons), MESSAGE_BATCH_SIZE):
+        batch = reasons[start:start + MESSAGE_BATCH_SIZE]
+        purposes = json.dumps([{'id': index, 'purpose': reason} for index, reason in enumerate(batch)], indent=2)
+        prompt = f"""
+        Create a natural, professional phone message for an automated call for each of the purposes below.
+
+        Each message should be:{MESSAGE_GUIDELINES}
+        Purposes:
+        {purposes}
+
+        Reply with only a JSON array containing one object per purpose, in the form
+        [{{"id": <purpose id>, "message": "<spoken message>"}}], and no other text.
+        """
+
+        try:
+            parsed = parse_message_batch(gemini_model.generate_content(prompt).text, len(batch))
+        except Exception as e:
+            print(f"Error generating message batch with Gemini: {e}")
+            parsed = {}
+
+        missing = len(batch) - len(parsed)
+        if missing:
+            print(f"Message batch: {missing} of {len(batch)} messages missing or invalid in the reply, "
+                  f"generating them one at a time")
+
+        for index, reason in enumerate(batch):
+            if index in parsed:
+                messages[reason] = parsed[index]
+                continue
+            try:
+                messages[reason] = request_call_message(reason)
+            except Exception as e:
+                print(f"Error generating message with Gemini: {e}")
+    return messages
+
+def generate_call_message(reason):
+    """Generate a natural call message using Gemini API (cached per normalized reason)"""
+    try:
+        return message_cache.get_or_generate(reason, request_call_message)
     except Exception as e:
         print(f"Error generating message with Gemini: {e}")
         return f"Hello, this is an automated call regarding: {reason}. Please call us back."
 
-def make_call(phone_number, message):
-    """Initiate a call using Twilio"""
+def make_call(phone_number, message, base_url=None):
+    """Initiate a call using Twilio (base_url is required outside a request, e.g. in campaign workers)"""
     try:
         # Generate TwiML for the call
         twiml = generate_twiml(message)
 
         # Get base URL for webhooks (in production, use ngrok or similar)
-        base_url = request.host_url.rstrip('/')
+        base_url = (base_url or request.host_url).rstrip('/')
+
+        # Stay within the account's calls-per-second limit
+        call_rate_limiter.acquire()
 
         # Make the call
         call = twilio_client.calls.create(
@@ -85,11 +225,7 @@ def make_call(phone_number, message):
         )
 
         # Initialize call status
-        call_statuses[call.sid] = {
-            'status': 'initiated',
-            'duration': 0,
-            'recording_url': None
-        }
+        call_state.advance(call.sid, 'initiated')
 
         return call.sid, "initiated"
     except Exception as e:
@@ -113,60 +249,34 @@ def generate_twiml(message):
 
     return str(response)
 
-def log_call(phone_number, reason, call_sid, status='initiated', duration=0, recording_url=None):
-    """Log call details to CSV"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-    # Create log entry
-    log_entry = {
-        'timestamp': timestamp,
-        'phone_number': phone_number,
-        'reason': reason,
-        'call_sid': call_sid or 'N/A',
-        'status': status,
-        'duration': duration or 0,
-        'recording_url': recording_url or 'N/A'
-    }
-
-    # Load existing logs or create new dataframe
-    if os.path.exists(LOGS_FILE):
-        df = pd.read_csv(LOGS_FILE)
-        # Update existing entry if call_sid exists, otherwise append
-        if call_sid and call_sid in df['call_sid'].values:
-            df.loc[df['call_sid'] == call_sid, ['status', 'duration', 'recording_url']] = [status, duration, recording_url]
-        else:
-            df = pd.concat([df, pd.DataFrame([log_entry])], ignore_index=True)
-    else:
-        df = pd.DataFrame([log_entry])
+def log_call(phone_number, reason, call_sid, status='initiated', duration=0, recording_url=None, campaign_id=None):
+    """Log call details (inserts the call, or updates it if the call_sid is already logged)"""
+    call_store.log_call(phone_number, reason, call_sid, status, duration, recording_url, campaign_id)
 
-    # Save to CSV
-    df.to_csv(LOGS_FILE, index=False)
+def prepare_campaign_messages(reasons):
+    """Generate one message per distinct campaign reason, in batched prompts, before any row is dialed"""
+    distinct = len({normalize_reason(reason) for reason in reasons})
+    generated = message_cache.warm(reasons, request_call_messages)
+    print(f"Campaign messages: {len(reasons)} rows, {distinct} distinct reasons, {generated} generated")
 
-def download_recording(recording_url, call_sid):
-    """Download recording from Twilio"""
-    try:
-        response = requests.get(recording_url, auth=(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN))
-        if response.status_code == 200:
-            filename = f"{RECORDINGS_DIR}{call_sid}.mp3"
-            with open(filename, 'wb') as f:
-                f.write(response.content)
-            return filename
-    except Exception as e:
-        print(f"Error downloading recording: {e}")
-    return None
+def dial_campaign_row(phone, reason, campaign_id, base_url):
+    """Generate the message for one bulk row, place the call and log it; returns True on success"""
+    message = generate_call_message(reason)
+    call_sid, status = make_call(phone, message, base_url)
+
+    if call_sid:
+        log_call(phone, reason, call_sid, status, campaign_id=campaign_id)
+        return True
 
-def load_logs():
-    """Load call logs from CSV"""
-    if os.path.exists(LOGS_FILE):
-        return pd.read_csv(LOGS_FILE)
-    return pd.DataFrame(columns=['timestamp', 'phone_number', 'reason', 'call_sid', 'status', 'duration', 'recording_url'])
+    # Clean up error message for logging
+    clean_error = "Authentication failed - check API keys" if "invalid username" in str(status) else "Call failed"
+    log_call(phone, reason, None, clean_error, campaign_id=campaign_id)
+    return False
 
 @app.route('/')
 def index():
     """Main dashboard"""
-    logs_df = load_logs()
-    recent_logs = logs_df.tail(10) if not logs_df.empty else pd.DataFrame()
-    return render_template('index.html', logs=recent_logs.to_dict('records') if not recent_logs.empty else [])
+    return render_template('index.html', logs=call_store.recent_calls(10), campaign_id=request.args.get('campaign'))
 
 @app.route('/call', methods=['POST'])
 def initiate_call():
@@ -212,58 +322,116 @@ def bulk_call():
         return redirect(url_for('index'))
 
     try:
-        df = pd.read_csv(file)
-
-        success_count = 0
-        for _, row in df.iterrows():
-            phone = str(row['phone_number']).strip()
-            reason = str(row['reason']).strip()
-
-            message = generate_call_message(reason)
-            call_sid, status = make_call(phone, message)
-
-            if call_sid:
-                log_call(phone, reason, call_sid, status)
-                success_count += 1
-            else:
-                # Clean up error message for logging
-                clean_error = "Authentication failed - check API keys" if "invalid username" in str(status) else "Call failed"
-                log_call(phone, reason, None, clean_error)
-
-        flash(f'Processed {len(df)} calls. {success_count} successful.', 'success')
+        df = pd.read_csv(file, dtype=str, keep_default_na=False)
+        missing = {'phone_number', 'reason'} - set(df.columns)
+        if missing:
+            flash(f"CSV is missing columns: {', '.join(sorted(missing))}", 'error')
+            return redirect(url_for('index'))
+
+        rows = list(zip(df['phone_number'].str.strip(), df['reason'].str.strip()))
+        if not rows:
+            flash('The CSV file has no rows', 'error')
+            return redirect(url_for('index'))
+
+        # Dial in the background and return straight away
+        base_url = request.host_url
+        campaign_id = bulk_dialer.start_campaign(
+            rows, lambda phone, reason, campaign: dial_campaign_row(phone, reason, campaign, base_url),
+            prepare=prepare_campaign_messages)
+        flash(f'Campaign {campaign_id} started: {len(rows)} calls queued.', 'success')
+        return redirect(url_for('index', campaign=campaign_id))
 
     except Exception as e:
         flash(f'Error processing CSV: {str(e)}', 'error')
 
     return redirect(url_for('index'))
 
+@app.route('/campaigns/<campaign_id>')
+def campaign_progress(campaign_id):
+    """Progress of a bulk campaign as JSON"""
+    campaign = call_store.get_campaign(campaign_id)
+    if not campaign:
+        return jsonify({'success': False, 'error': 'Campaign not found'}), 404
+    return jsonify({'success': True, **campaign})
+
+def log_filters(args):
+    """Call log filters from query parameters; raises ValueError for a malformed date"""
+    filters = {key: args.get(key, '').strip() or None for key in ('status', 'reason', 'phone')}
+    filters['campaign_id'] = args.get('campaign', '').strip() or None
+    for key in ('date_from', 'date_to'):
+        value = args.get(key, '').strip()
+        if value:
+            datetime.strptime(value, '%Y-%m-%d')
+        filters[key] = value or None
+    return filters
+
 @app.route('/logs')
 def view_logs():
-    """View all call logs"""
-    logs_df = load_logs()
-    logs = logs_df.to_dict('records') if not logs_df.empty else []
-    return render_template('logs.html', logs=logs)
+    """View call logs; rows are fetched page by page from /api/logs"""
+    return render_template('logs.html', has_logs=call_store.has_calls(), filters=request.args,
+                           sort_columns=SORT_COLUMNS)
+
+@app.route('/api/logs')
+def logs_api():
+    """
+    One page of call logs as JSON (filters: status, date_from, date_to, reason, phone, campaign; sort, order)
+    Pass the next_cursor of a page as cursor to get the page after it.
+    """
+    try:
+        filters = log_filters(request.args)
+        result = call_store.query_calls(per_page=request.args.get('per_page', 50),
+                                        sort=request.args.get('sort', 'timestamp'),
+                                        order=request.args.get('order', 'desc'),
+                                        cursor=request.args.get('cursor') or None,
+                                        **filters)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, **result})
+
+def csv_chunks(batches, compress=False):
+    """
+    CSV header, then one chunk per batch of log rows, optionally gzip-compressed
+    The header is yielded before the first batch is read.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip container
+    for batch in itertools.chain([[LOG_COLUMNS]], batches):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerows(batch)
+        data = buffer.getvalue().encode('utf-8')
+        if compressor:
+            # Sync-flush so every chunk is sent now instead of waiting in the compressor
+            data = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    if compressor:
+        yield compressor.flush()
 
 @app.route('/download-logs')
 def download_logs():
-    """Download call logs as CSV"""
-    logs_df = load_logs()
-    if logs_df.empty:
+    """
+    Download call logs as CSV, streamed in batches as they are read
+    Filters: status, date_from, date_to, campaign (and reason, phone); gzip=1 compresses
+    """
+    try:
+        filters = log_filters(request.args)
+    except ValueError as e:
+        return f"Invalid filter: {e}", 400
+    if not call_store.has_calls(**filters):
         return "No logs available", 404
 
-    csv_data = logs_df.to_csv(index=False)
-    response = make_response(csv_data)
-    response.headers['Content-Disposition'] = 'attachment; filename=call_logs.csv'
-    response.headers['Content-Type'] = 'text/csv'
+    compress = request.args.get('gzip') in ('1', 'true', 'yes')
+    filename = 'call_logs.csv.gz' if compress else 'call_logs.csv'
+    response = Response(csv_chunks(call_store.iter_logs(**filters), compress),
+                        mimetype='application/gzip' if compress else 'text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
     return response
 
 @app.route('/clear-logs', methods=['POST'])
 def clear_logs():
     """Clear all call logs and recordings"""
     try:
-        # Remove the CSV file
-        if os.path.exists(LOGS_FILE):
-            os.remove(LOGS_FILE)
+        # Delete every logged call
+        call_store.clear()
 
         # Clear recordings directory (optional - comment out if you want to keep recordings)
         # import shutil
@@ -271,9 +439,8 @@ def clear_logs():
         #     shutil.rmtree(RECORDINGS_DIR)
         #     os.makedirs(RECORDINGS_DIR, exist_ok=True)
 
-        # Clear in-memory call statuses
-        global call_statuses
-        call_statuses.clear()
+        # Clear live call statuses (shared by every worker process)
+        call_state.clear()
 
         flash('All call logs have been cleared successfully.', 'success')
     except Exception as e:
@@ -299,39 +466,86 @@ def generate_message_api():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+def is_signed_by_twilio():
+    """Whether the request carries a valid X-Twilio-Signature for its URL and form"""
+    if not VALIDATE_TWILIO_SIGNATURE:
+        return True
+    url = f"{TWILIO_WEBHOOK_BASE_URL}{request.full_path.rstrip('?')}" if TWILIO_WEBHOOK_BASE_URL else request.url
+    return twilio_validator.validate(url, request.form.to_dict(), request.headers.get('X-Twilio-Signature', ''))
+
+def accept_webhook_event(call_sid, **event):
+    """Persist a validated callback, then queue it; it is retried by any process if not applied in time"""
+    event_id = call_store.add_webhook_event(call_sid, event)
+    webhook_queue.enqueue(call_sid, event_id=event_id, **event)
+
 @app.route('/twilio/status', methods=['POST'])
 def twilio_status_callback():
-    """Handle Twilio call status updates"""
-    call_sid = request.form.get('CallSid')
+    """Handle Twilio call status updates (persisted and queued; processed by the webhook workers)"""
+    if not is_signed_by_twilio():
+        return 'Invalid signature', 403
+
+    call_sid = request.form.get('CallSid', '')
     call_status = request.form.get('CallStatus')
     call_duration = request.form.get('CallDuration', 0)
 
-    if call_sid:
-        # Update in-memory status
-        call_statuses[call_sid] = {
-            'status': call_status,
-            'duration': int(call_duration) if call_duration else 0,
-            'recording_url': call_statuses.get(call_sid, {}).get('recording_url')
-        }
-
-        # Update CSV log
-        logs_df = load_logs()
-        if not logs_df.empty and call_sid in logs_df['call_sid'].values:
-            logs_df.loc[logs_df['call_sid'] == call_sid, ['status', 'duration']] = [call_status, int(call_duration) if call_duration else 0]
-            logs_df.to_csv(LOGS_FILE, index=False)
-
-        # If call is completed, try to fetch recording manually
-        if call_status == 'completed':
-            fetch_recording_for_call(call_sid)
+    if not CALL_SID_PATTERN.match(call_sid) or call_status not in STATUS_RANK:
+        return 'Invalid status callback', 400
+    if not str(call_duration or 0).isdigit():
+        return 'Invalid call duration', 400
+
+    accept_webhook_event(call_sid, status=call_status, duration=int(call_duration or 0))
+    return '', 200
+
+@app.route('/twilio/recording', methods=['POST'])
+def twilio_recording_callback():
+    """Handle Twilio recording callbacks (persisted and queued; processed by the webhook workers)"""
+    if not is_signed_by_twilio():
+        return 'Invalid signature', 403
 
+    call_sid = request.form.get('CallSid', '')
+    recording_url = request.form.get('RecordingUrl')
+
+    if not CALL_SID_PATTERN.match(call_sid) or not is_allowed_url(recording_url):
+        return 'Invalid recording callback', 400
+
+    accept_webhook_event(call_sid, recording_url=recording_url)
     return '', 200
 
+def process_call_update(call_sid, update):
+    """Apply one coalesced webhook update: persist the status, then fetch the recording if there is one"""
+    # Update the shared call state; a status older than the current one is ignored
+    if 'status' in update and call_state.advance(call_sid, update['status'], update.get('duration', 0)):
+        # Update the call log row
+        call_store.update_call(call_sid, status=update['status'], duration=update.get('duration', 0))
+
+    if update.get('recording_url'):
+        store_recording(call_sid, update['recording_url'])
+    elif update.get('status') == 'completed' and not recording_downloader.is_pending(call_sid):
+        # No recording callback yet, try to fetch recording manually
+        fetch_recording_for_call(call_sid)
+
+def store_recording(call_sid, recording_url):
+    """
+    Point the call log at the Twilio recording and queue its download; the log is
+    switched to the local copy once it is on disk
+    """
+    if not recording_downloader.is_pending(call_sid):
+        call_store.update_call(call_sid, recording_url=recording_url)
+    return recording_downloader.submit(call_sid, recording_url + '.mp3',
+                                       on_done=lambda local_path: recording_saved(call_sid, local_path))
+
+def recording_saved(call_sid, local_path):
+    """Record the local path of a downloaded recording"""
+    # Update status
+    call_state.update(call_sid, recording_url=local_path)
+
+    # Update the call log row
+    call_store.update_call(call_sid, recording_url=local_path)
+    print(f"✅ Recording downloaded for call {call_sid}: {local_path}")
+
 def fetch_recording_for_call(call_sid):
     """Manually fetch recording for a completed call"""
     try:
-        # Get call details from Twilio
-        call = twilio_client.calls(call_sid).fetch()
-
         # Get recordings for this call
         recordings = twilio_client.recordings.list(call_sid=call_sid, limit=1)
 
@@ -339,48 +553,29 @@ def fetch_recording_for_call(call_sid):
             recording = recordings[0]
             recording_url = f"https://api.twilio.com{recording.uri[:-5]}"  # Remove .json extension
 
-            # Download the recording
-            local_path = download_recording(recording_url + '.mp3', call_sid)
-
-            if local_path:
-                # Update status
-                if call_sid in call_statuses:
-                    call_statuses[call_sid]['recording_url'] = local_path
-
-                # Update CSV log
-                logs_df = load_logs()
-                if not logs_df.empty and call_sid in logs_df['call_sid'].values:
-                    logs_df.loc[logs_df['call_sid'] == call_sid, 'recording_url'] = local_path
-                    logs_df.to_csv(LOGS_FILE, index=False)
-
-                print(f"✅ Recording downloaded for call {call_sid}: {local_path}")
-            else:
-                print(f"❌ Failed to download recording for call {call_sid}")
+            store_recording(call_sid, recording_url)
 
     except Exception as e:
         print(f"Error fetching recording for call {call_sid}: {e}")
 
-@app.route('/twilio/recording', methods=['POST'])
-def twilio_recording_callback():
-    """Handle Twilio recording callbacks"""
-    call_sid = request.form.get('CallSid')
-    recording_url = request.form.get('RecordingUrl')
-
-    if call_sid and recording_url:
-        # Download the recording
-        local_path = download_recording(recording_url + '.mp3', call_sid)
-
-        # Update status
-        if call_sid in call_statuses:
-            call_statuses[call_sid]['recording_url'] = local_path
-
-        # Update CSV log
-        logs_df = load_logs()
-        if not logs_df.empty and call_sid in logs_df['call_sid'].values:
-            logs_df.loc[logs_df['call_sid'] == call_sid, 'recording_url'] = local_path or recording_url
-            logs_df.to_csv(LOGS_FILE, index=False)
-
-    return '', 200
+def retry_webhook_events():
+    """
+    Queue persisted callbacks that no process has applied, e.g. those left by a
+    stopped process; each event is claimed atomically, so only one process runs it
+    """
+    while True:
+        try:
+            for event_id, event_call_sid, event in call_store.claim_webhook_events(WEBHOOK_RETRY_SECONDS):
+                webhook_queue.enqueue(event_call_sid, event_id=event_id, **event)
+        except Exception as e:
+            print(f"Error retrying webhook events: {e}")
+        time.sleep(WEBHOOK_SWEEP_SECONDS)
+
+# Twilio callbacks are answered at once and applied by background workers; events
+# persisted but not applied in time (e.g. before the last shutdown) are retried
+webhook_queue = WebhookQueue(process_call_update, workers=WEBHOOK_WORKERS,
+                             done=call_store.delete_webhook_events)
+threading.Thread(target=retry_webhook_events, name='webhook-retry', daemon=True).start()
 
 if __name__ == '__main__':
     # For development, you might want to use ngrok to expose the webhook endpoints
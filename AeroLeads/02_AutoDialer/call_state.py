@@ -0,0 +1,272 @@
+"""
+Call state - live status of in-progress calls, shared by every app process
+A status callback can land on any worker process behind the webhook URL, so call
+state cannot live in one process's memory. Backends share one interface:
+SQLiteCallState (the default) keeps the state in a WAL-mode database that every
+process on the machine opens, and MemoryCallState is a thread-safe dict for
+single-process runs. Status changes go through advance(), which atomically
+refuses to move a call back to an earlier status, so callbacks handled out of
+order by different processes cannot regress a finished call.
+The backend also holds what processes must coordinate on: the token buckets
+that keep every process together within Twilio's calls-per-second limit, and
+claims on recording downloads so only one process fetches each recording.
+"""
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+# Order of Twilio call statuses (the final ones share the highest rank)
+STATUS_RANK = {
+    'queued': 0,
+    'initiated': 1,
+    'ringing': 2,
+    'in-progress': 3,
+    'completed': 4,
+    'busy': 4,
+    'failed': 4,
+    'no-answer': 4,
+    'canceled': 4
+}
+
+FIELDS = ('status', 'duration', 'recording_url')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS call_state (
+    call_sid TEXT PRIMARY KEY,
+    status TEXT,
+    duration INTEGER DEFAULT 0,
+    recording_url TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS token_buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS recording_claims (
+    call_sid TEXT PRIMARY KEY,
+    claimed_at REAL NOT NULL
+);
+"""
+
+
+def status_rank(status):
+    return STATUS_RANK.get(status, -1)
+
+
+def refill(tokens, updated_at, now, rate, capacity):
+    """
+    Take one token from a bucket last left with tokens at updated_at
+    Returns: (tokens left, seconds to wait before retrying; 0 if the token was taken)
+    """
+    tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class CallState(ABC):
+    """Interface of call-state backends"""
+
+    @abstractmethod
+    def update(self, call_sid, **fields):
+        """Change fields of a call, creating it if needed"""
+
+    @abstractmethod
+    def advance(self, call_sid, status, duration=0):
+        """
+        Set the status and duration unless the call already has a later status
+        Returns: True if the status was applied
+        """
+
+    @abstractmethod
+    def take_token(self, name, rate, capacity):
+        """
+        Take a token from the shared bucket name (refilled at rate per second up to capacity)
+        Returns: 0 if a token was taken, else the seconds to wait before trying again
+        """
+
+    @abstractmethod
+    def claim_recording(self, call_sid, stale_seconds):
+        """
+        Claim the download of a call's recording; a claim older than stale_seconds
+        (its process died mid-download) can be taken over, and is pruned
+        Returns: True if this caller now holds the claim
+        """
+
+    @abstractmethod
+    def recording_claimed(self, call_sid, stale_seconds):
+        """True if some process holds a live claim on the call's recording"""
+
+    @abstractmethod
+    def release_recording(self, call_sid):
+        """Drop a claim once its download has ended (succeeded or failed)"""
+
+    @abstractmethod
+    def clear(self):
+        """Forget every call"""
+
+
+class MemoryCallState(CallState):
+    """Thread-safe in-process backend (single process only)"""
+
+    def __init__(self):
+        self.calls = {}
+        self.buckets = {}  # name -> (tokens, updated_at)
+        self.claims = {}  # call_sid -> claimed_at
+        self.lock = threading.Lock()
+
+    def update(self, call_sid, **fields):
+        with self.lock:
+            state = self.calls.setdefault(call_sid, {'status': None, 'duration': 0, 'recording_url': None})
+            state.update((key, value) for key, value in fields.items() if key in FIELDS)
+
+    def advance(self, call_sid, status, duration=0):
+        with self.lock:
+            state = self.calls.setdefault(call_sid, {'status': None, 'duration': 0, 'recording_url': None})
+            if status_rank(status) < status_rank(state['status']):
+                return False
+            state['status'] = status
+            state['duration'] = duration
+            return True
+
+    def take_token(self, name, rate, capacity):
+        with self.lock:
+            now = time.time()
+            tokens, updated_at = self.buckets.get(name, (capacity, now))
+            tokens, wait = refill(tokens, updated_at, now, rate, capacity)
+            self.buckets[name] = (tokens, now)
+            return wait
+
+    def claim_recording(self, call_sid, stale_seconds):
+        with self.lock:
+            now = time.time()
+            if now - self.claims.get(call_sid, 0) < stale_seconds:
+                return False
+            for stale in [sid for sid, claimed_at in self.claims.items() if now - claimed_at >= stale_seconds]:
+                del self.claims[stale]
+            self.claims[call_sid] = now
+            return True
+
+    def recording_claimed(self, call_sid, stale_seconds):
+        with self.lock:
+            return time.time() - self.claims.get(call_sid, 0) < stale_seconds
+
+    def release_recording(self, call_sid):
+        with self.lock:
+            self.claims.pop(call_sid, None)
+
+    def clear(self):
+        with self.lock:
+            self.calls.clear()
+            self.claims.clear()
+
+
+class SQLiteCallState(CallState):
+    """Process-safe backend: a WAL-mode SQLite table opened by every worker process"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # isolation_level=None: transactions are opened explicitly with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def update(self, call_sid, **fields):
+        fields = {key: value for key, value in fields.items() if key in FIELDS}
+        if not fields:
+            return
+        columns = ', '.join(fields)
+        placeholders = ', '.join('?' for _ in fields)
+        assignments = ', '.join(f"{column} = excluded.{column}" for column in fields)
+        with self.lock:
+            self.conn.execute(
+                f"INSERT INTO call_state (call_sid, {columns}, updated_at) VALUES (?, {placeholders}, ?) "
+                f"ON CONFLICT(call_sid) DO UPDATE SET {assignments}, updated_at = excluded.updated_at",
+                [call_sid] + list(fields.values()) + [time.time()])
+
+    def transaction(self, work):
+        """
+        Run work() in a BEGIN IMMEDIATE transaction and return its result
+        The write lock is taken up front, so reads and writes in work() cannot
+        interleave with another process.
+        """
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work()
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def advance(self, call_sid, status, duration=0):
+        def work():
+            row = self.conn.execute("SELECT status FROM call_state WHERE call_sid = ?", (call_sid,)).fetchone()
+            if row is not None and status_rank(status) < status_rank(row['status']):
+                return False
+            self.conn.execute(
+                "INSERT INTO call_state (call_sid, status, duration, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(call_sid) DO UPDATE SET status = excluded.status, "
+                "duration = excluded.duration, updated_at = excluded.updated_at",
+                (call_sid, status, duration, time.time()))
+            return True
+        return self.transaction(work)
+
+    def take_token(self, name, rate, capacity):
+        def work():
+            now = time.time()
+            row = self.conn.execute("SELECT tokens, updated_at FROM token_buckets WHERE name = ?", (name,)).fetchone()
+            tokens, wait = refill(row['tokens'] if row else capacity, row['updated_at'] if row else now,
+                                  now, rate, capacity)
+            self.conn.execute("INSERT OR REPLACE INTO token_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                              (name, tokens, now))
+            return wait
+        return self.transaction(work)
+
+    def claim_recording(self, call_sid, stale_seconds):
+        def work():
+            now = time.time()
+            row = self.conn.execute("SELECT claimed_at FROM recording_claims WHERE call_sid = ?",
+                                    (call_sid,)).fetchone()
+            if row and now - row['claimed_at'] < stale_seconds:
+                return False
+            self.conn.execute("DELETE FROM recording_claims WHERE claimed_at <= ?", (now - stale_seconds,))
+            self.conn.execute("INSERT OR REPLACE INTO recording_claims (call_sid, claimed_at) VALUES (?, ?)",
+                              (call_sid, now))
+            return True
+        return self.transaction(work)
+
+    def recording_claimed(self, call_sid, stale_seconds):
+        with self.lock:
+            row = self.conn.execute("SELECT claimed_at FROM recording_claims WHERE call_sid = ?",
+                                    (call_sid,)).fetchone()
+        return bool(row) and time.time() - row['claimed_at'] < stale_seconds
+
+    def release_recording(self, call_sid):
+        with self.lock:
+            self.conn.execute("DELETE FROM recording_claims WHERE call_sid = ?", (call_sid,))
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM call_state")
+            self.conn.execute("DELETE FROM recording_claims")
+
+
+def open_call_state(backend='sqlite', path=None):
+    """
+    Call-state backend by name: 'sqlite' (shared by processes, at path) or 'memory'
+    Returns: CallState
+    """
+    if backend == 'memory':
+        return MemoryCallState()
+    if backend == 'sqlite':
+        return SQLiteCallState(path)
+    raise ValueError(f"Unknown call state backend: {backend}")
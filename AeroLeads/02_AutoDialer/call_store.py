@@ -0,0 +1,369 @@
+"""
+SQLite call log - one row per call, updated in place by call_sid
+Webhooks update a single row through the call_sid index instead of rewriting a
+CSV, so their cost does not grow with the history and concurrent callbacks
+cannot overwrite each other. The database runs in WAL mode, so the pages can
+read while webhooks write. The call_logs view has the old CSV layout, the same
+as CSV exports.
+The log listing pages with a keyset cursor (the sort value and id of the last
+row shown) rather than OFFSET, and every sort column has an index in the sort's
+collation, so each page is a range read of the index whatever its depth.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+
+LOG_COLUMNS = ['timestamp', 'phone_number', 'reason', 'call_sid', 'status', 'duration', 'recording_url']
+
+# Columns in CSV layout: missing call SIDs and recordings read as 'N/A'
+LOG_SELECT = """timestamp, phone_number, reason, COALESCE(call_sid, 'N/A') AS call_sid, status,
+       COALESCE(duration, 0) AS duration, COALESCE(recording_url, 'N/A') AS recording_url"""
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    phone_number TEXT,
+    reason TEXT,
+    call_sid TEXT,
+    status TEXT,
+    duration INTEGER DEFAULT 0,
+    recording_url TEXT,
+    campaign_id TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_calls_sid ON calls(call_sid);
+CREATE TABLE IF NOT EXISTS campaigns (
+    campaign_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    finished_at TEXT,
+    total INTEGER NOT NULL,
+    dialed INTEGER DEFAULT 0,
+    succeeded INTEGER DEFAULT 0,
+    failed INTEGER DEFAULT 0,
+    status TEXT DEFAULT 'running'
+);
+CREATE TABLE IF NOT EXISTS webhook_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    call_sid TEXT NOT NULL,
+    event TEXT NOT NULL,
+    received_at TEXT NOT NULL,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_calls_timestamp ON calls(timestamp);
+CREATE INDEX IF NOT EXISTS idx_calls_status ON calls(status, timestamp);
+CREATE INDEX IF NOT EXISTS idx_calls_status_sort ON calls(status);
+CREATE INDEX IF NOT EXISTS idx_calls_phone ON calls(phone_number COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_calls_reason ON calls(reason COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_calls_duration ON calls(duration);
+CREATE VIEW IF NOT EXISTS call_logs AS
+SELECT {LOG_SELECT}
+FROM calls ORDER BY id;
+"""
+
+# Columns the log listing can be sorted by
+SORT_COLUMNS = ('timestamp', 'phone_number', 'reason', 'status', 'duration')
+
+# ORDER BY expression of each sort column, matching the collation of its index
+SORT_EXPRESSIONS = {
+    'timestamp': 'timestamp',
+    'phone_number': 'phone_number COLLATE NOCASE',
+    'reason': 'reason COLLATE NOCASE',
+    'status': 'status',
+    'duration': 'duration'
+}
+
+MAX_PAGE_SIZE = 200
+
+
+def like_prefix(value):
+    """LIKE pattern matching values that start with value (wildcards in it are literal)"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def filter_clause(status=None, date_from=None, date_to=None, reason=None, phone=None, campaign_id=None):
+    """
+    WHERE clause for call log filters, each served by an index on calls
+    Dates are YYYY-MM-DD and both ends are inclusive; reason and phone match
+    case-insensitive prefixes.
+    Returns: (sql, params), sql is empty without filters
+    """
+    conditions = []
+    params = []
+    if status:
+        conditions.append("status = ?")
+        params.append(status)
+    if date_from:
+        conditions.append("timestamp >= ?")
+        params.append(date_from)
+    if date_to:
+        conditions.append("timestamp < date(?, '+1 day')")
+        params.append(date_to)
+    if reason:
+        conditions.append("reason LIKE ? ESCAPE '\\'")
+        params.append(like_prefix(reason))
+    if phone:
+        conditions.append("phone_number LIKE ? ESCAPE '\\'")
+        params.append(like_prefix(phone))
+    if campaign_id:
+        conditions.append("campaign_id = ?")
+        params.append(campaign_id)
+    return (f"WHERE {' AND '.join(conditions)}" if conditions else ''), params
+
+
+def parse_cursor(cursor):
+    """
+    Sort value and id of the last row of a page from a next_cursor string
+    Raises: ValueError for a malformed cursor
+    """
+    try:
+        value, row_id = json.loads(cursor)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if not isinstance(row_id, int) or not isinstance(value, (str, int, float)):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return value, row_id
+
+
+class CallStore:
+    """Call log database shared by the routes and the Twilio webhooks"""
+
+    def __init__(self, path, legacy_csv=None):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        is_new = not os.path.exists(path)
+
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.add_missing_columns()
+        self.fill_sort_columns()
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_calls_campaign ON calls(campaign_id)")
+        self.conn.commit()
+        self.lock = threading.Lock()
+
+        if is_new and legacy_csv and os.path.exists(legacy_csv):
+            self.import_csv(legacy_csv)
+
+    def add_missing_columns(self):
+        """Upgrade call tables created by older versions"""
+        columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(calls)")}
+        if 'campaign_id' not in columns:
+            self.conn.execute("ALTER TABLE calls ADD COLUMN campaign_id TEXT")
+        columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(webhook_events)")}
+        if 'claimed_at' not in columns:
+            self.conn.execute("ALTER TABLE webhook_events ADD COLUMN claimed_at REAL")
+
+    def fill_sort_columns(self):
+        """Replace NULLs in sort columns (older versions stored them), which keyset cursors cannot compare"""
+        self.conn.execute(
+            "UPDATE calls SET phone_number = COALESCE(phone_number, ''), reason = COALESCE(reason, ''), "
+            "status = COALESCE(status, ''), duration = COALESCE(duration, 0) "
+            "WHERE phone_number IS NULL OR reason IS NULL OR status IS NULL OR duration IS NULL")
+
+    def import_csv(self, csv_path):
+        """Load an existing call_logs.csv into the database (once, when it is created)"""
+        df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+        rows = []
+        for record in df.to_dict('records'):
+            rows.append((
+                record.get('timestamp', ''),
+                record.get('phone_number', ''),
+                record.get('reason', ''),
+                record.get('call_sid') if record.get('call_sid') not in ('', 'N/A') else None,
+                record.get('status', ''),
+                int(float(record.get('duration') or 0)),
+                record.get('recording_url') if record.get('recording_url') not in ('', 'N/A') else None
+            ))
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO calls (timestamp, phone_number, reason, call_sid, status, duration, recording_url) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        print(f"Imported {len(rows)} calls from {csv_path}")
+
+    def log_call(self, phone_number, reason, call_sid, status='initiated', duration=0, recording_url=None,
+                 campaign_id=None):
+        """Insert a call, or update the existing row with the same call_sid"""
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self.lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO calls (timestamp, phone_number, reason, call_sid, status, duration, recording_url,
+                                   campaign_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(call_sid) DO UPDATE SET
+                    status = excluded.status,
+                    duration = excluded.duration,
+                    recording_url = COALESCE(excluded.recording_url, calls.recording_url)
+                """,
+                (timestamp, phone_number or '', reason or '', call_sid or None, status or '', duration or 0,
+                 recording_url, campaign_id))
+
+    def update_call(self, call_sid, **fields):
+        """
+        Update columns (status, duration, recording_url) of one call by call_sid
+        Returns: True if the call exists
+        """
+        if not call_sid or not fields:
+            return False
+        assignments = ', '.join(f"{column} = ?" for column in fields)
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                f"UPDATE calls SET {assignments} WHERE call_sid = ?", list(fields.values()) + [call_sid])
+        return cursor.rowcount > 0
+
+    def get_call(self, call_sid):
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM calls WHERE call_sid = ?", (call_sid,)).fetchone()
+        return dict(row) if row else None
+
+    def recent_calls(self, limit=10):
+        """Latest calls, oldest first (like tail() of the old CSV)"""
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT {LOG_SELECT} FROM (SELECT * FROM calls ORDER BY id DESC LIMIT ?) ORDER BY id",
+                (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def query_calls(self, per_page=50, sort='timestamp', order='desc', cursor=None, **filters):
+        """
+        One page of the call log, filtered (see filter_clause) and sorted
+        The first page is fetched without a cursor; each later one with the
+        next_cursor of the page before it. Only the first page counts the matches.
+        Returns: dict with logs (CSV layout), per_page, next_cursor (None on the
+        last page) and, on the first page, total
+        Raises: ValueError for a malformed cursor or per_page
+        """
+        sort = sort if sort in SORT_COLUMNS else 'timestamp'
+        expression = SORT_EXPRESSIONS[sort]
+        order, after = ('ASC', '>') if str(order).lower() == 'asc' else ('DESC', '<')
+        per_page = max(1, min(int(per_page), MAX_PAGE_SIZE))
+        where, params = filter_clause(**filters)
+        page_where, page_params = where, list(params)
+        if cursor:
+            value, row_id = parse_cursor(cursor)
+            # The single-column bound lets SQLite seek the index; the row value breaks ties by id
+            condition = f"{expression} {after}= ? AND ({expression}, id) {after} (?, ?)"
+            page_where = f"{where} AND {condition}" if where else f"WHERE {condition}"
+            page_params += [value, value, row_id]
+
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT id, {LOG_SELECT} FROM calls {page_where} "
+                f"ORDER BY {expression} {order}, id {order} LIMIT ?",
+                page_params + [per_page + 1]).fetchall()
+            total = None if cursor else self.conn.execute(f"SELECT COUNT(*) FROM calls {where}", params).fetchone()[0]
+
+        logs = [dict(row) for row in rows[:per_page]]
+        next_cursor = None
+        if len(rows) > per_page:
+            last = logs[-1]
+            next_cursor = json.dumps([last[sort], last['id']])
+        for log in logs:
+            del log['id']
+        result = {'logs': logs, 'per_page': per_page, 'next_cursor': next_cursor}
+        if total is not None:
+            result['total'] = total
+        return result
+
+    def has_calls(self, **filters):
+        """True if any call matches the filters (see filter_clause)"""
+        where, params = filter_clause(**filters)
+        with self.lock:
+            return self.conn.execute(f"SELECT 1 FROM calls {where} LIMIT 1", params).fetchone() is not None
+
+    def iter_logs(self, batch_size=1000, **filters):
+        """
+        Yield batches of matching calls in CSV layout (lists of tuples), oldest first
+        Reads on a connection of its own, so a long export holds neither the store
+        lock nor more than one batch in memory.
+        """
+        where, params = filter_clause(**filters)
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=30)
+        try:
+            cursor = conn.execute(f"SELECT {LOG_SELECT} FROM calls {where} ORDER BY id", params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    def add_webhook_event(self, call_sid, event):
+        """
+        Persist a received Twilio callback until it has been applied
+        The event is stored claimed by the process that received it.
+        Returns: event id
+        """
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO webhook_events (call_sid, event, received_at, claimed_at) VALUES (?, ?, ?, ?)",
+                (call_sid, json.dumps(event), datetime.now().strftime('%Y-%m-%d %H:%M:%S'), time.time()))
+        return cursor.lastrowid
+
+    def delete_webhook_events(self, event_ids):
+        """Forget callbacks that have been applied"""
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM webhook_events WHERE id = ?", [(event_id,) for event_id in event_ids])
+
+    def claim_webhook_events(self, stale_seconds):
+        """
+        Claim callbacks that are unclaimed, or were claimed more than stale_seconds ago
+        and still not applied (their process stopped, or applying them failed)
+        The events are read and claimed in one BEGIN IMMEDIATE transaction, so each
+        one is handed to a single process however many look at once.
+        Returns: [(event id, call_sid, event)], oldest first
+        """
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self.conn.execute(
+                    "SELECT id, call_sid, event FROM webhook_events "
+                    "WHERE claimed_at IS NULL OR claimed_at < ? ORDER BY id", (now - stale_seconds,)).fetchall()
+                self.conn.executemany("UPDATE webhook_events SET claimed_at = ? WHERE id = ?",
+                                      [(now, row['id']) for row in rows])
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return [(row['id'], row['call_sid'], json.loads(row['event'])) for row in rows]
+
+    def create_campaign(self, campaign_id, total):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO campaigns (campaign_id, created_at, total) VALUES (?, ?, ?)",
+                (campaign_id, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), total))
+
+    def record_campaign_call(self, campaign_id, success):
+        """Count one dialed row of a campaign, completing it with the last one"""
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self.lock, self.conn:
+            self.conn.execute(
+                """
+                UPDATE campaigns SET
+                    dialed = dialed + 1,
+                    succeeded = succeeded + ?,
+                    failed = failed + ?,
+                    status = CASE WHEN dialed + 1 >= total THEN 'completed' ELSE status END,
+                    finished_at = CASE WHEN dialed + 1 >= total THEN ? ELSE finished_at END
+                WHERE campaign_id = ?
+                """,
+                (1 if success else 0, 0 if success else 1, now, campaign_id))
+
+    def get_campaign(self, campaign_id):
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM campaigns WHERE campaign_id = ?", (campaign_id,)).fetchone()
+        return dict(row) if row else None
+
+    def clear(self):
+        """Delete every call and campaign"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM calls")
+            self.conn.execute("DELETE FROM campaigns")
@@ -0,0 +1,70 @@
+"""
+Bulk dialing - campaigns dialed by a bounded worker pool
+A campaign is registered and handed to a fixed-size thread pool, and its id is
+returned at once, so the upload request does not wait for the calls. Progress
+is counted in the call store for the /campaigns/<id> endpoint. Twilio's
+calls-per-second limit is enforced by a token bucket kept in the shared call
+state, so it holds for every call placed by any of the app's processes.
+"""
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+class TokenBucket:
+    """Token bucket stored in a call-state backend; acquire() blocks until a token is available"""
+
+    def __init__(self, state, name, rate, capacity=None, sleep=time.sleep):
+        self.state = state
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.sleep = sleep
+
+    def acquire(self):
+        """Take one token, waiting for the bucket to refill if it is empty"""
+        while True:
+            wait = self.state.take_token(self.name, self.rate, self.capacity)
+            if wait <= 0:
+                return
+            self.sleep(wait)
+
+
+class BulkDialer:
+    """Runs campaign rows on a bounded thread pool and records their progress"""
+
+    def __init__(self, store, workers=4):
+        self.store = store
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dialer')
+
+    def start_campaign(self, rows, dial, prepare=None):
+        """
+        Queue (phone_number, reason) rows; dial(phone_number, reason, campaign_id) places
+        one call and returns True on success
+        prepare(reasons), if given, runs once in the background before any row is
+        dialed (e.g. to generate one message per distinct reason).
+        Returns: campaign id
+        """
+        campaign_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self.store.create_campaign(campaign_id, len(rows))
+        self.pool.submit(self.run_campaign, campaign_id, rows, dial, prepare)
+        return campaign_id
+
+    def run_campaign(self, campaign_id, rows, dial, prepare):
+        if prepare:
+            try:
+                prepare([reason for _, reason in rows])
+            except Exception as e:
+                print(f"Error preparing campaign {campaign_id}: {e}")
+        for phone_number, reason in rows:
+            self.pool.submit(self.dial_row, campaign_id, phone_number, reason, dial)
+
+    def dial_row(self, campaign_id, phone_number, reason, dial):
+        success = False
+        try:
+            success = dial(phone_number, reason, campaign_id)
+        except Exception as e:
+            print(f"Error dialing {phone_number} for campaign {campaign_id}: {e}")
+        finally:
+            self.store.record_campaign_call(campaign_id, success)
@@ -0,0 +1,153 @@
+"""
+Call message cache - generated messages memoized per reason
+Messages are keyed by the normalized reason ("Payment reminder." and "payment
+reminder" share one entry) and the prompt version, so changing the prompt
+starts a fresh cache. An in-memory LRU sits in front of a SQLite table; entries
+expire after a TTL and the least recently used ones are evicted beyond a size
+limit. Concurrent requests for the same reason wait for one generation instead
+of each calling the LLM.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    prompt_version TEXT NOT NULL,
+    reason_key TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (prompt_version, reason_key)
+);
+CREATE INDEX IF NOT EXISTS idx_messages_last_used ON messages(last_used);
+"""
+
+# Puts between sweeps of expired and excess entries on disk
+PRUNE_EVERY = 50
+
+
+def normalize_reason(reason):
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a call reason"""
+    return ' '.join(str(reason).lower().split()).strip(' .!?,;:')
+
+
+class MessageCache:
+    """Two-level (memory LRU + SQLite) cache of generated call messages"""
+
+    def __init__(self, path, prompt_version, ttl_seconds=7 * 24 * 3600, max_entries=10000, memory_entries=256):
+        self.path = path
+        self.prompt_version = prompt_version
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.memory = OrderedDict()  # reason_key -> (message, created_at)
+        self.lock = threading.Lock()
+        self.key_locks = {}
+        self.puts = 0
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def get(self, reason):
+        """Cached message for a reason, or None if missing or expired"""
+        key = normalize_reason(reason)
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry and now - entry[1] < self.ttl_seconds:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            row = self.conn.execute(
+                "SELECT message, created_at FROM messages WHERE prompt_version = ? AND reason_key = ?",
+                (self.prompt_version, key)).fetchone()
+            if row and now - row[1] < self.ttl_seconds:
+                with self.conn:
+                    self.conn.execute(
+                        "UPDATE messages SET last_used = ? WHERE prompt_version = ? AND reason_key = ?",
+                        (now, self.prompt_version, key))
+                self.remember(key, row[0], row[1])
+                self.hits += 1
+                return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, reason, message):
+        key = normalize_reason(reason)
+        now = time.time()
+        with self.lock:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO messages (prompt_version, reason_key, message, created_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.prompt_version, key, message, now, now))
+            self.remember(key, message, now)
+            self.puts += 1
+            if self.puts % PRUNE_EVERY == 0:
+                self.prune()
+
+    def remember(self, key, message, created_at):
+        """Add to the memory LRU, dropping the least recently used entry when full (lock held)"""
+        self.memory[key] = (message, created_at)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def prune(self):
+        """Delete expired entries and the least recently used beyond max_entries (lock held)"""
+        with self.conn:
+            self.conn.execute("DELETE FROM messages WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            self.conn.execute(
+                "DELETE FROM messages WHERE rowid NOT IN "
+                "(SELECT rowid FROM messages ORDER BY last_used DESC LIMIT ?)", (self.max_entries,))
+
+    def get_or_generate(self, reason, generate):
+        """
+        Cached message for reason, calling generate(reason) once on a miss
+        Concurrent callers with the same reason share that one call.
+        """
+        message = self.get(reason)
+        if message is not None:
+            return message
+
+        key = normalize_reason(reason)
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # Another thread may have generated it while we waited
+            message = self.get(reason)
+            if message is None:
+                message = generate(reason)
+                self.put(reason, message)
+        with self.lock:
+            self.key_locks.pop(key, None)
+        return message
+
+    def warm(self, reasons, generate_many):
+        """
+        Generate messages for the distinct reasons that are not cached yet
+        generate_many(reasons) returns a dict of reason -> message and may leave out
+        reasons it could not generate.
+        Returns: number of messages generated
+        """
+        distinct = {}
+        for reason in reasons:
+            distinct.setdefault(normalize_reason(reason), reason)
+        missing = [reason for reason in distinct.values() if self.get(reason) is None]
+        if not missing:
+            return 0
+
+        messages = generate_many(missing)
+        for reason, message in messages.items():
+            self.put(reason, message)
+        return len(messages)
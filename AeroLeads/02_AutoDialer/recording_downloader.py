@@ -0,0 +1,124 @@
+"""
+Recording downloader - call recordings fetched in the background
+Downloads run on a small thread pool sharing one pooled HTTP session, so the
+connection to Twilio is reused and only a bounded number of recordings are
+fetched at once. Each recording is streamed in chunks to a temporary file that
+is renamed into place when complete: memory use does not depend on the length
+of the recording, and a half-written MP3 never appears under its final name.
+A call's recording is downloaded at most once, however many callbacks ask for it:
+downloads in flight are tracked per process, and with a claims backend (the
+shared call state) a download is claimed before it starts, so callbacks landing
+on different processes do not fetch the same recording twice. The claim is
+dropped when the download ends: from then on the file itself marks it as done.
+The session sends the account credentials, so only URLs on the allowed hosts
+(Twilio's API) are ever fetched.
+"""
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+
+CHUNK_SIZE = 64 * 1024
+
+# A claim older than this is taken to belong to a process that died mid-download
+CLAIM_STALE_SECONDS = 600
+
+# Hosts recordings may be downloaded from (the session carries the account credentials)
+ALLOWED_HOSTS = ('api.twilio.com',)
+
+
+def is_allowed_url(url, allowed_hosts=ALLOWED_HOSTS):
+    """True for https URLs on one of the allowed hosts"""
+    parsed = urlparse(url or '')
+    return parsed.scheme == 'https' and parsed.hostname in allowed_hosts
+
+
+class RecordingDownloader:
+    """Deduplicated, bounded-concurrency streaming downloads of call recordings"""
+
+    def __init__(self, directory, auth=None, workers=3, timeout=30, allowed_hosts=ALLOWED_HOSTS, claims=None):
+        self.directory = directory
+        self.claims = claims  # CallState shared by the app's processes, or None for this process only
+        self.allowed_hosts = allowed_hosts
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.auth = auth
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='recording')
+        self.lock = threading.Lock()
+        self.in_flight = {}  # call_sid -> Future
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, call_sid):
+        return os.path.join(self.directory, f"{call_sid}.mp3")
+
+    def submit(self, call_sid, recording_url, on_done=None):
+        """
+        Queue the download of a call's recording unless it is downloaded or downloading
+        on_done(local_path) runs once the file is in place (at once if it already is).
+        Returns: Future of the local path, or None if the file already exists or the URL is not allowed
+        """
+        if not is_allowed_url(recording_url, self.allowed_hosts):
+            print(f"Refusing to download recording for call {call_sid} from {recording_url}")
+            return None
+        path = self.path_for(call_sid)
+        with self.lock:
+            # Finished downloads are renamed into place before they leave in_flight
+            future = self.in_flight.get(call_sid)
+            if future is None and not os.path.exists(path):
+                if self.claims and not self.claims.claim_recording(call_sid, CLAIM_STALE_SECONDS):
+                    # Another process is downloading it and will update the call log
+                    return None
+                if self.claims and os.path.exists(path):
+                    # Another process finished it between the check and the claim
+                    self.claims.release_recording(call_sid)
+                else:
+                    future = self.pool.submit(self.download, call_sid, recording_url, on_done)
+                    self.in_flight[call_sid] = future
+
+        if future is None and on_done:
+            on_done(path)
+        return future
+
+    def is_pending(self, call_sid):
+        """True if the recording is downloaded or being downloaded (by any process)"""
+        with self.lock:
+            if call_sid in self.in_flight:
+                return True
+        if self.claims and self.claims.recording_claimed(call_sid, CLAIM_STALE_SECONDS):
+            return True
+        return os.path.exists(self.path_for(call_sid))
+
+    def download(self, call_sid, recording_url, on_done=None):
+        """Stream one recording to disk; returns the local path, or None on failure"""
+        path = self.path_for(call_sid)
+        temp_path = None
+        try:
+            with self.session.get(recording_url, stream=True, timeout=self.timeout) as response:
+                response.raise_for_status()
+                fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{call_sid}.", suffix='.part')
+                with os.fdopen(fd, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        f.write(chunk)
+            os.replace(temp_path, path)
+            temp_path = None
+        except Exception as e:
+            print(f"Error downloading recording for call {call_sid}: {e}")
+            path = None
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            if self.claims:
+                # The file is in place, or the download failed and may be retried
+                self.claims.release_recording(call_sid)
+            with self.lock:
+                self.in_flight.pop(call_sid, None)
+
+        if path and on_done:
+            on_done(path)
+        return path
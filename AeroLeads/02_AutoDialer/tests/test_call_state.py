@@ -0,0 +1,91 @@
+import time
+import pytest
+from call_state import CallState, open_call_state
+from dialer import TokenBucket
+
+CALL_SID = 'CA' + '0' * 32
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def state(request, tmp_path):
+    return open_call_state(request.param, str(tmp_path / 'call_state.db'))
+
+
+def test_call_state_is_abstract():
+    with pytest.raises(TypeError):
+        CallState()
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        open_call_state('redis')
+
+
+def test_advance_moves_forward_only(state):
+    assert state.advance(CALL_SID, 'initiated')
+    assert state.advance(CALL_SID, 'ringing')
+    assert not state.advance(CALL_SID, 'queued')
+    assert state.advance(CALL_SID, 'completed', 30)
+    assert not state.advance(CALL_SID, 'in-progress')
+    assert not state.advance(CALL_SID, 'ringing')
+
+
+def test_final_statuses_share_a_rank(state):
+    assert state.advance(CALL_SID, 'completed', 30)
+    assert state.advance(CALL_SID, 'busy')
+
+
+def test_clear_forgets_calls(state):
+    state.advance(CALL_SID, 'completed')
+    state.clear()
+
+    assert state.advance(CALL_SID, 'ringing')
+
+
+def test_sqlite_state_is_shared_between_connections(tmp_path):
+    first = open_call_state('sqlite', str(tmp_path / 'call_state.db'))
+    second = open_call_state('sqlite', str(tmp_path / 'call_state.db'))
+
+    assert first.advance(CALL_SID, 'completed')
+    assert not second.advance(CALL_SID, 'ringing')
+    assert first.claim_recording(CALL_SID, 600)
+    assert not second.claim_recording(CALL_SID, 600)
+    assert second.recording_claimed(CALL_SID, 600)
+
+
+def test_take_token_empties_the_bucket_then_asks_to_wait(state):
+    assert state.take_token('calls', 1, 2) == 0
+    assert state.take_token('calls', 1, 2) == 0
+    assert 0 < state.take_token('calls', 1, 2) <= 1
+    assert state.take_token('other', 1, 2) == 0
+
+
+def test_recording_claims(state):
+    assert state.claim_recording(CALL_SID, 600)
+    assert not state.claim_recording(CALL_SID, 600)
+    assert state.recording_claimed(CALL_SID, 600)
+
+    state.release_recording(CALL_SID)
+    assert not state.recording_claimed(CALL_SID, 600)
+    assert state.claim_recording(CALL_SID, 600)
+
+
+def test_stale_recording_claims_can_be_taken_over(state):
+    assert state.claim_recording(CALL_SID, 600)
+    time.sleep(0.01)
+
+    assert not state.recording_claimed(CALL_SID, 0)
+    assert state.claim_recording(CALL_SID, 0)
+
+
+def test_token_bucket_shares_the_rate_between_processes(tmp_path):
+    path = str(tmp_path / 'call_state.db')
+    buckets = [TokenBucket(open_call_state('sqlite', path), 'calls', rate=20, capacity=1) for _ in range(2)]
+
+    start = time.monotonic()
+    for _ in range(3):
+        for bucket in buckets:
+            bucket.acquire()
+
+    # One token up front, then five more at 20 per second between both buckets
+    assert time.monotonic() - start >= 0.2
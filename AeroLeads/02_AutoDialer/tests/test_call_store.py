@@ -0,0 +1,101 @@
+import random
+import sqlite3
+import pytest
+from call_store import CallStore, SORT_COLUMNS, SORT_EXPRESSIONS
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CallStore(str(tmp_path / 'calls.db'))
+    rng = random.Random(7)
+    for i in range(137):
+        store.log_call(rng.choice(['+1555', '+1555', '+1666', '+2777']), rng.choice(['Follow up', 'follow up', 'Demo']),
+                       f"CA{i:032x}", rng.choice(['completed', 'busy', 'failed']), rng.randint(0, 4))
+    return store
+
+
+def all_pages(store, **query):
+    """Walk every page of a query by its cursors; returns (call_sids, total)"""
+    page = store.query_calls(**query)
+    total = page['total']
+    call_sids = [log['call_sid'] for log in page['logs']]
+    while page['next_cursor']:
+        page = store.query_calls(cursor=page['next_cursor'], **query)
+        assert 'total' not in page
+        call_sids += [log['call_sid'] for log in page['logs']]
+    return call_sids, total
+
+
+def expected_order(store, sort, order, where='', params=()):
+    rows = store.conn.execute(
+        f"SELECT call_sid FROM calls {where} ORDER BY {SORT_EXPRESSIONS[sort]} {order}, id {order}", params)
+    return [row['call_sid'] for row in rows]
+
+
+@pytest.mark.parametrize('sort', SORT_COLUMNS)
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_cursor_pages_cover_every_row_once_in_order(store, sort, order):
+    call_sids, total = all_pages(store, per_page=10, sort=sort, order=order)
+
+    assert total == 137
+    assert call_sids == expected_order(store, sort, order)
+
+
+def test_cursor_pages_apply_filters(store):
+    call_sids, total = all_pages(store, per_page=7, sort='reason', order='asc', status='busy', phone='+15')
+
+    expected = expected_order(store, 'reason', 'asc',
+                              "WHERE status = 'busy' AND phone_number LIKE '+15%'")
+    assert call_sids == expected
+    assert total == len(expected)
+
+
+def test_single_page_has_no_cursor(store):
+    page = store.query_calls(per_page=200)
+
+    assert len(page['logs']) == 137
+    assert page['next_cursor'] is None
+    assert set(page['logs'][0]) == {'timestamp', 'phone_number', 'reason', 'call_sid', 'status', 'duration',
+                                    'recording_url'}
+
+
+@pytest.mark.parametrize('cursor', ['not json', '[1]', '["a", "b"]', '[null, 3]'])
+def test_malformed_cursors_are_rejected(store, cursor):
+    with pytest.raises(ValueError):
+        store.query_calls(cursor=cursor)
+
+
+@pytest.mark.parametrize('sort', SORT_COLUMNS)
+def test_sorted_pages_are_read_from_an_index(store, sort):
+    expression = SORT_EXPRESSIONS[sort]
+    plan = store.conn.execute(
+        f"EXPLAIN QUERY PLAN SELECT * FROM calls WHERE {expression} <= ? AND ({expression}, id) < (?, ?) "
+        f"ORDER BY {expression} DESC, id DESC LIMIT 51", ('x', 'x', 1)).fetchall()
+
+    details = ' '.join(row['detail'] for row in plan)
+    assert 'USING INDEX' in details
+    assert 'TEMP B-TREE' not in details
+
+
+def test_null_sort_values_from_older_versions_are_filled(tmp_path):
+    path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE calls (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL, "
+                 "phone_number TEXT, reason TEXT, call_sid TEXT, status TEXT, duration INTEGER DEFAULT 0, "
+                 "recording_url TEXT)")
+    conn.executemany("INSERT INTO calls (timestamp, duration) VALUES (?, NULL)", [('2024-01-01',), ('2024-01-02',)])
+    conn.commit()
+    conn.close()
+
+    store = CallStore(path)
+    call_sids, total = all_pages(store, per_page=1, sort='phone_number', order='desc')
+
+    assert total == 2 and len(call_sids) == 2
+    assert store.query_calls()['logs'][0]['duration'] == 0
+
+
+def test_has_calls(store, tmp_path):
+    assert store.has_calls()
+    assert store.has_calls(status='busy')
+    assert not store.has_calls(phone='+9')
+    assert not CallStore(str(tmp_path / 'empty.db')).has_calls()
@@ -0,0 +1,52 @@
+import importlib
+import os
+import pytest
+
+
+@pytest.fixture(scope='module')
+def app_flask(tmp_path_factory):
+    """The app module, imported in a scratch directory (it creates its data files on import)"""
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('app'))
+    try:
+        return importlib.import_module('app_flask')
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.mark.parametrize('value, expected', [
+    (3, 3),
+    ('4', 4),
+    (' 5 ', 5),
+    (True, None),
+    (1.5, None),
+    ('-1', None),
+    ('two', None),
+    (None, None),
+])
+def test_parse_batch_id(app_flask, value, expected):
+    assert app_flask.parse_batch_id(value) == expected
+
+
+def test_parse_message_batch_reads_the_array_around_surrounding_text(app_flask):
+    text = 'Here you go:\n```json\n[{"id": 0, "message": " Hello "}, {"id": "1", "message": "Hi"}]\n```'
+
+    assert app_flask.parse_message_batch(text, 2) == {0: 'Hello', 1: 'Hi'}
+
+
+def test_parse_message_batch_skips_invalid_entries(app_flask):
+    text = """[
+        {"id": 0, "message": "first"},
+        {"id": 0, "message": "duplicate"},
+        {"id": 5, "message": "out of range"},
+        {"id": 1, "message": "   "},
+        {"id": 2},
+        "not an object"
+    ]"""
+
+    assert app_flask.parse_message_batch(text, 3) == {0: 'first'}
+
+
+@pytest.mark.parametrize('text', ['no json here', '[{"id": 0, "message": "unterminated"', '{"id": 0}'])
+def test_parse_message_batch_returns_nothing_for_unusable_replies(app_flask, text):
+    assert app_flask.parse_message_batch(text, 1) == {}
@@ -0,0 +1,91 @@
+import os
+import threading
+import pytest
+from call_state import open_call_state
+from recording_downloader import RecordingDownloader, is_allowed_url
+
+CALL_SID = 'CA' + '0' * 32
+RECORDING_URL = 'https://api.twilio.com/2010-04-01/Accounts/AC1/Recordings/RE1.mp3'
+
+
+class FakeResponse:
+    """Streams one chunk once release is set; raises on raise_for_status when failed"""
+
+    def __init__(self, release, failed=False):
+        self.release = release
+        self.failed = failed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def raise_for_status(self):
+        if self.failed:
+            raise RuntimeError("404 Not Found")
+
+    def iter_content(self, chunk_size):
+        self.release.wait(5)
+        yield b'ID3 audio'
+
+
+@pytest.fixture
+def state(tmp_path):
+    return open_call_state('sqlite', str(tmp_path / 'call_state.db'))
+
+
+def downloader(tmp_path, state, release, failed=False):
+    """A downloader of one app process (its own connection to the shared state)"""
+    claims = open_call_state('sqlite', state.path)
+    recordings = RecordingDownloader(str(tmp_path / 'recordings'), claims=claims)
+    recordings.session.get = lambda url, **kwargs: FakeResponse(release, failed)
+    return recordings
+
+
+@pytest.mark.parametrize('url, allowed', [
+    (RECORDING_URL, True),
+    ('http://api.twilio.com/recording.mp3', False),
+    ('https://api.twilio.com.example.com/recording.mp3', False),
+    ('https://example.com/recording.mp3', False),
+    (None, False),
+])
+def test_is_allowed_url(url, allowed):
+    assert is_allowed_url(url) is allowed
+
+
+def test_a_recording_is_downloaded_by_one_process_and_its_claim_released(tmp_path, state):
+    release = threading.Event()
+    first, second = downloader(tmp_path, state, release), downloader(tmp_path, state, release)
+
+    future = first.submit(CALL_SID, RECORDING_URL)
+    assert second.submit(CALL_SID, RECORDING_URL) is None
+    assert second.is_pending(CALL_SID)
+
+    release.set()
+    path = future.result(5)
+    with open(path, 'rb') as f:
+        assert f.read() == b'ID3 audio'
+    assert state.conn.execute("SELECT COUNT(*) FROM recording_claims").fetchone()[0] == 0
+
+    saved = []
+    assert second.submit(CALL_SID, RECORDING_URL, on_done=saved.append) is None
+    assert saved == [path]
+
+
+def test_a_failed_download_leaves_no_file_and_can_be_retried(tmp_path, state):
+    release = threading.Event()
+    release.set()
+    failing = downloader(tmp_path, state, release, failed=True)
+
+    assert failing.submit(CALL_SID, RECORDING_URL).result(5) is None
+    assert not failing.is_pending(CALL_SID)
+    assert os.listdir(failing.directory) == []
+    assert downloader(tmp_path, state, release).submit(CALL_SID, RECORDING_URL).result(5)
+
+
+def test_disallowed_urls_are_not_fetched(tmp_path, state):
+    recordings = downloader(tmp_path, state, threading.Event())
+
+    assert recordings.submit(CALL_SID, 'https://example.com/recording.mp3') is None
+    assert not recordings.is_pending(CALL_SID)
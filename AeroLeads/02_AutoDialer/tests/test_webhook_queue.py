@@ -0,0 +1,100 @@
+import threading
+import time
+import pytest
+from call_store import CallStore
+from webhook_queue import WebhookQueue, merge_event
+
+CALL_SID = 'CA' + '0' * 32
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_merge_keeps_the_most_advanced_status():
+    pending = merge_event({}, {'status': 'completed', 'duration': 42})
+    merge_event(pending, {'status': 'ringing', 'duration': 0})
+
+    assert pending == {'status': 'completed', 'duration': 42}
+
+
+def test_merge_takes_a_later_status_and_keeps_other_fields():
+    pending = merge_event({}, {'status': 'ringing', 'recording_url': 'https://api.twilio.com/r'})
+    merge_event(pending, {'status': 'in-progress', 'duration': 3})
+
+    assert pending == {'status': 'in-progress', 'duration': 3, 'recording_url': 'https://api.twilio.com/r'}
+
+
+def test_merge_ignores_missing_values():
+    pending = merge_event({}, {'status': 'completed', 'recording_url': 'https://api.twilio.com/r'})
+    merge_event(pending, {'recording_url': None})
+
+    assert pending['recording_url'] == 'https://api.twilio.com/r'
+
+
+def test_events_for_a_call_being_handled_are_coalesced():
+    started, release = threading.Event(), threading.Event()
+    updates, done = [], []
+
+    def handle(call_sid, update):
+        updates.append(update)
+        started.set()
+        release.wait(5)
+
+    queue = WebhookQueue(handle, workers=2, done=done.extend)
+    queue.enqueue(CALL_SID, event_id=1, status='ringing')
+    started.wait(5)
+    queue.enqueue(CALL_SID, event_id=2, status='completed', duration=12)
+    queue.enqueue(CALL_SID, event_id=3, status='in-progress')
+    release.set()
+
+    wait_for(lambda: len(done) == 3)
+    assert updates == [{'status': 'ringing'}, {'status': 'completed', 'duration': 12}]
+    assert sorted(done) == [1, 2, 3]
+
+
+def test_events_of_a_failed_update_are_not_reported_done():
+    done = []
+
+    def handle(call_sid, update):
+        raise RuntimeError("database is locked")
+
+    queue = WebhookQueue(handle, workers=1, done=done.extend)
+    queue.enqueue(CALL_SID, event_id=1, status='completed')
+
+    wait_for(lambda: CALL_SID not in queue.active and CALL_SID not in queue.pending)
+    assert done == []
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CallStore(str(tmp_path / 'calls.db'))
+
+
+def test_received_events_are_claimed_by_their_process(store):
+    store.add_webhook_event(CALL_SID, {'status': 'ringing'})
+
+    assert store.claim_webhook_events(60) == []
+
+
+def test_unclaimed_and_stale_events_are_claimed_once(store, tmp_path):
+    fresh = store.add_webhook_event(CALL_SID, {'status': 'ringing'})
+    stale = store.add_webhook_event(CALL_SID, {'status': 'completed', 'duration': 5})
+    with store.conn:
+        store.conn.execute("UPDATE webhook_events SET claimed_at = NULL WHERE id = ?", (stale,))
+    other_process = CallStore(str(tmp_path / 'calls.db'))
+
+    assert store.claim_webhook_events(60) == [(stale, CALL_SID, {'status': 'completed', 'duration': 5})]
+    assert other_process.claim_webhook_events(60) == []
+    time.sleep(0.05)
+    assert [event_id for event_id, _, _ in other_process.claim_webhook_events(0)] == [fresh, stale]
+
+
+def test_applied_events_are_deleted(store):
+    event_id = store.add_webhook_event(CALL_SID, {'status': 'ringing'})
+    store.delete_webhook_events([event_id])
+
+    assert store.claim_webhook_events(0) == []
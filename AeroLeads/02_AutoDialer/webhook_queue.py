@@ -0,0 +1,74 @@
+"""
+Webhook queue - Twilio callbacks processed off the request thread
+The webhook routes only validate and enqueue an event, so Twilio gets its 200 in
+milliseconds however slow the database or recording downloads are. Events are
+coalesced per call_sid while they wait: the ringing/answered/completed burst of
+one call becomes a single update carrying the most advanced status. Each call
+is handled by one worker at a time, so its updates are applied in order.
+Events are persisted by the caller before Twilio gets its 200; done(event_ids)
+is called once they have been applied, so events still queued at a restart can
+be replayed.
+"""
+import queue
+import threading
+from call_state import STATUS_RANK
+
+
+def merge_event(pending, event):
+    """Fold event into the pending update of the same call"""
+    status = event.get('status')
+    if status and STATUS_RANK.get(status, 0) < STATUS_RANK.get(pending.get('status'), -1):
+        event = {key: value for key, value in event.items() if key not in ('status', 'duration')}
+    for key, value in event.items():
+        if value is not None:
+            pending[key] = value
+    return pending
+
+
+class WebhookQueue:
+    """Coalescing per-call event queue drained by a pool of daemon worker threads"""
+
+    def __init__(self, handle, workers=2, done=None):
+        self.handle = handle  # handle(call_sid, update)
+        self.done = done  # done(event_ids) after the events of an update were applied
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.pending = {}  # call_sid -> merged update
+        self.event_ids = {}  # call_sid -> ids of the persisted events merged into its update
+        self.active = set()  # call_sids being handled by a worker
+
+        for i in range(workers):
+            threading.Thread(target=self.work, name=f'webhook-{i}', daemon=True).start()
+
+    def enqueue(self, call_sid, event_id=None, **event):
+        """Queue an event for call_sid; merged into its pending update if one is waiting"""
+        with self.lock:
+            if event_id is not None:
+                self.event_ids.setdefault(call_sid, []).append(event_id)
+            if call_sid in self.pending:
+                merge_event(self.pending[call_sid], event)
+                return
+            self.pending[call_sid] = merge_event({}, event)
+            # A call being handled is requeued by its worker when it finishes
+            if call_sid not in self.active:
+                self.queue.put(call_sid)
+
+    def work(self):
+        while True:
+            call_sid = self.queue.get()
+            with self.lock:
+                update = self.pending.pop(call_sid)
+                event_ids = self.event_ids.pop(call_sid, [])
+                self.active.add(call_sid)
+            try:
+                self.handle(call_sid, update)
+                if self.done and event_ids:
+                    self.done(event_ids)
+            except Exception as e:
+                # The persisted events are kept and retried once their claim goes stale
+                print(f"Error processing webhook for call {call_sid}: {e}")
+            finally:
+                with self.lock:
+                    self.active.discard(call_sid)
+                    if call_sid in self.pending:
+                        self.queue.put(call_sid)